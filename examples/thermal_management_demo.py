@@ -42,7 +42,7 @@ def demo_basic_thermal_management():
             thermal_mgr.cooling_break()
 
         # Generate and time the operation
-        start = time.time()
+        start = time.monotonic()
         image = gen.generate(
             prompt=prompt,
             num_inference_steps=steps,
@@ -50,7 +50,7 @@ def demo_basic_thermal_management():
             save_path=output_mgr.get_output_path(f"sunset_{steps:02d}steps.png"),
             auto_save=True
         )
-        elapsed = time.time() - start
+        elapsed = time.monotonic() - start
 
         # Record timing for thermal analysis
         thermal_mgr.record_timing(elapsed)
@@ -102,7 +102,7 @@ def demo_batch_thermal_management():
             thermal_mgr.cooling_break()
 
         # Generate and time
-        start = time.time()
+        start = time.monotonic()
         image = gen.generate(
             prompt=prompt,
             num_inference_steps=steps_per_image,
@@ -110,7 +110,7 @@ def demo_batch_thermal_management():
             save_path=output_mgr.get_output_path(f"mountain_{i:03d}.png"),
             auto_save=True
         )
-        elapsed = time.time() - start
+        elapsed = time.monotonic() - start
 
         thermal_mgr.record_timing(elapsed)
         print(f"  ✓ Completed in {elapsed:.2f}s")
@@ -163,7 +163,7 @@ def demo_long_running_with_thermal_management():
             thermal_mgr.cooling_break()
 
         # Generate and time
-        start = time.time()
+        start = time.monotonic()
         image = gen.generate(
             prompt=prompt,
             num_inference_steps=steps,
@@ -171,7 +171,7 @@ def demo_long_running_with_thermal_management():
             save_path=output_mgr.get_output_path(f"lincoln_{steps:04d}steps.png"),
             auto_save=True
         )
-        elapsed = time.time() - start
+        elapsed = time.monotonic() - start
 
         thermal_mgr.record_timing(elapsed)
 
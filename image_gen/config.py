@@ -113,6 +113,11 @@ class Config:
         if config_file and config_file.exists():
             self._load_overrides(config_file)
 
+        # Environment override, e.g. a tmpfs scratch directory for test runs
+        output_dir = os.environ.get("IMAGE_GEN_OUTPUT_DIR")
+        if output_dir:
+            self.output["directory"] = output_dir
+
     def _load_overrides(self, config_file: Path) -> None:
         """
         Load configuration overrides from YAML file.
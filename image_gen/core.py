@@ -10,7 +10,7 @@ and provides a unified API for image generation tasks.
 """
 
 from PIL import Image
-from typing import Optional, List, Literal
+from typing import Callable, Optional, List, Literal
 from pathlib import Path
 import logging
 import subprocess
@@ -74,6 +74,10 @@ class ImageGenerator:
         # Lazy-loaded model instances
         self._flux_generator: Optional[FluxGenerator] = None
 
+        # Paths written by the most recent generate()/generate_batch() call
+        self.last_saved_path: Optional[Path] = None
+        self.last_saved_paths: List[Path] = []
+
         logger.info("ImageGenerator initialized")
         if auto_preview:
             logger.info("Auto-preview enabled")
@@ -104,6 +108,7 @@ class ImageGenerator:
         model: ModelType = "flux",
         save_path: Optional[Path] = None,
         auto_save: bool = True,
+        step_callback: Optional[Callable[[int, int], None]] = None,
     ) -> Image.Image:
         """
         Generate an image from a text prompt.
@@ -117,6 +122,8 @@ class ImageGenerator:
             model: Which model to use ("flux" for SDXL currently)
             save_path: Where to save the image (None = auto-generate)
             auto_save: Whether to save the image automatically
+            step_callback: Called after each denoising step with
+                (completed_steps, total_steps)
 
         Returns:
             PIL Image object
@@ -140,16 +147,19 @@ class ImageGenerator:
             height=height,
             width=width,
             num_inference_steps=num_inference_steps,
-            seed=seed
+            seed=seed,
+            step_callback=step_callback
         )
 
         # Handle saving
+        self.last_saved_path = None
         if auto_save:
             if save_path is None:
                 save_path = self._generate_output_path(prompt)
 
             save_path.parent.mkdir(parents=True, exist_ok=True)
             image.save(save_path)
+            self.last_saved_path = save_path
             logger.info(f"Image saved to: {save_path}")
 
             # Auto-preview if enabled
@@ -197,6 +207,7 @@ class ImageGenerator:
             )
 
         images = []
+        saved_paths = []
         for i, prompt in enumerate(prompts, 1):
             logger.info(f"Generating image {i}/{len(prompts)}")
 
@@ -210,7 +221,10 @@ class ImageGenerator:
                 auto_save=auto_save
             )
             images.append(image)
+            if self.last_saved_path is not None:
+                saved_paths.append(self.last_saved_path)
 
+        self.last_saved_paths = saved_paths
         return images
 
     def _generate_output_path(self, prompt: str) -> Path:
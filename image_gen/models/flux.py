@@ -18,14 +18,30 @@ from diffusers import (
     ControlNetModel
 )
 from PIL import Image
-from typing import Optional, Tuple, Union, List
+from typing import Callable, Optional, Tuple, Union, List
+from contextlib import nullcontext
 import logging
 import time
 import io
 import base64
 
+try:
+    from torch.nn.attention import SDPBackend, sdpa_kernel
+except ImportError:  # torch < 2.3
+    SDPBackend = sdpa_kernel = None
+
+try:
+    from diffusers import FirstBlockCacheConfig
+except ImportError:  # diffusers < 0.35
+    FirstBlockCacheConfig = None
+
+try:
+    from DeepCache import DeepCacheSDHelper
+except ImportError:  # Optional: UNet step caching
+    DeepCacheSDHelper = None
+
 from image_gen.config import get_config
-from image_gen.utils.device import get_device
+from image_gen.utils.device import configure_compile_cache, get_device
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +78,12 @@ class FluxGenerator:
         ... )
     """
 
-    def __init__(self, device: Optional[str] = None):
+    def __init__(
+        self,
+        device: Optional[str] = None,
+        compile_model: bool = False,
+        compile_mode: str = "reduce-overhead"
+    ):
         """
         Initialize FLUX generator with automatic model loading.
 
@@ -71,6 +92,9 @@ class FluxGenerator:
 
         Args:
             device: Override device selection. If None, auto-detects MPS/CUDA/CPU.
+            compile_model: Wrap the denoiser in torch.compile (opt-in; pays off
+                when many images share the same size)
+            compile_mode: torch.compile mode used when compile_model is True
 
         Raises:
             RuntimeError: If model fails to load
@@ -80,6 +104,15 @@ class FluxGenerator:
         self.model_id = get_config().get_model_id("flux")
         self.device = get_device(device)
 
+        # Snapshot per-call defaults so generate() skips dict and string lookups
+        self._default_height, self._default_width = self.config["default_size"]
+        self._default_steps = self.config.get("default_steps", 30)
+        self._guidance_scale = self.config.get("guidance_scale", 7.5)
+        self._is_flux = "flux" in self.model_id.lower()
+
+        # FLUX doesn't use guidance_scale, but SDXL does
+        self._pipeline_kwargs = {} if self._is_flux else {"guidance_scale": self._guidance_scale}
+
         logger.info(f"Initializing FLUX.1 Schnell on device: {self.device}")
         logger.info(f"Model ID: {self.model_id}")
 
@@ -89,13 +122,14 @@ class FluxGenerator:
         # Store additional pipelines for img2img and controlnet
         self.img2img_pipeline = None
         self.controlnet_pipeline = None
+        self._deepcache = None  # Set by enable_step_cache() on SDXL
 
         try:
             # Load pipeline with torch_dtype for memory efficiency
             logger.info("Loading FLUX pipeline (this may take a while on first run)...")
 
             # Auto-detect pipeline type based on model_id
-            if "flux" in self.model_id.lower():
+            if self._is_flux:
                 pipeline_class = FluxPipeline
             else:
                 pipeline_class = StableDiffusionXLPipeline
@@ -117,6 +151,8 @@ class FluxGenerator:
                     cache_dir=get_config().cache_dir
                 )
                 self.pipeline = self.pipeline.to(self.device)
+                # Fused attention kernels are pinned per call by
+                # _attention_context(), without touching process-wide flags
             else:
                 # CPU uses float32
                 self.pipeline = pipeline_class.from_pretrained(
@@ -128,10 +164,118 @@ class FluxGenerator:
             load_time = time.time() - start_time
             logger.info(f"✓ FLUX pipeline loaded successfully in {load_time:.1f}s")
 
+            if compile_model:
+                self._compile_denoiser(compile_mode)
+
         except Exception as e:
             logger.error(f"Failed to load FLUX pipeline: {e}")
             raise RuntimeError(f"Could not initialize FLUX model: {e}")
 
+    def _compile_denoiser(self, mode: str) -> None:
+        """
+        Wrap the denoiser (FLUX transformer or SDXL UNet) in torch.compile.
+
+        Compilation happens on the first generate() call and again for each
+        new image size, so it only pays off when shapes repeat. Kernels are
+        kept in the persistent inductor cache next to the model weights.
+        Falls back to eager execution if torch.compile is unavailable.
+
+        Args:
+            mode: torch.compile mode ("default", "reduce-overhead", "max-autotune")
+        """
+        name = "transformer" if self._is_flux else "unet"
+        configure_compile_cache(get_config().cache_dir)
+        try:
+            setattr(self.pipeline, name, torch.compile(getattr(self.pipeline, name), mode=mode))
+            logger.info(f"✓ {name} wrapped in torch.compile (mode={mode})")
+        except Exception as e:
+            logger.warning(f"torch.compile unavailable, running eager: {e}")
+
+    def enable_step_cache(self, threshold: float = 0.12, cache_interval: int = 3) -> bool:
+        """
+        Reuse denoiser features across adjacent timesteps (training-free).
+
+        FLUX transformers use diffusers' First Block Cache, which skips the
+        remaining blocks while the first block's output barely changes. SDXL
+        UNets use DeepCache when that package is installed. Outputs differ
+        slightly from an uncached run, so this is opt-in.
+
+        Args:
+            threshold: First Block Cache relative-change threshold (FLUX)
+            cache_interval: Full UNet pass every N steps (DeepCache, SDXL)
+
+        Returns:
+            True if a cache was enabled, False if none is available
+        """
+        if self._is_flux:
+            if FirstBlockCacheConfig is None:
+                logger.warning("First Block Cache needs diffusers >= 0.35, running uncached")
+                return False
+            self.pipeline.transformer.enable_cache(FirstBlockCacheConfig(threshold=threshold))
+            logger.info(f"✓ First Block Cache enabled (threshold={threshold})")
+            return True
+
+        if DeepCacheSDHelper is None:
+            logger.warning("DeepCache not installed, running uncached")
+            return False
+        self._deepcache = DeepCacheSDHelper(pipe=self.pipeline)
+        self._deepcache.set_params(cache_interval=cache_interval, cache_branch_id=0)
+        self._deepcache.enable()
+        logger.info(f"✓ DeepCache enabled (cache_interval={cache_interval})")
+        return True
+
+    def _resolve_inputs(
+        self,
+        prompts: List[str],
+        height: Optional[int],
+        width: Optional[int],
+        num_inference_steps: Optional[int],
+    ) -> Tuple[int, int, int]:
+        """
+        Validate prompts and size, filling in config defaults.
+
+        Shared by generate() and the batched path of generate_batch() so both
+        reject the same inputs before anything reaches the pipeline.
+
+        Args:
+            prompts: Prompts for the request (each must be non-empty)
+            height: Requested height in pixels, or None for the default
+            width: Requested width in pixels, or None for the default
+            num_inference_steps: Requested steps, or None for the default
+
+        Returns:
+            Tuple of (height, width, num_inference_steps)
+
+        Raises:
+            ValueError: If a prompt is empty or the size is not a multiple of 8
+        """
+        if any(not prompt or not prompt.strip() for prompt in prompts):
+            raise ValueError("Prompt cannot be empty")
+
+        # Use config defaults if not specified
+        height = height or self._default_height
+        width = width or self._default_width
+        num_inference_steps = num_inference_steps or self._default_steps
+
+        # Latents are 1/8 of the image size, so other sizes can't be denoised
+        if height % 8 != 0 or width % 8 != 0:
+            raise ValueError(f"Height and width must be multiples of 8. Got {height}x{width}")
+
+        return height, width, num_inference_steps
+
+    def _attention_context(self):
+        """
+        Pin scaled_dot_product_attention to the flash/memory-efficient backends.
+
+        Only applies on CUDA; MPS and CPU keep PyTorch's default selection.
+
+        Returns:
+            Context manager to wrap pipeline calls in
+        """
+        if self.device.type != "cuda" or sdpa_kernel is None:
+            return nullcontext()
+        return sdpa_kernel([SDPBackend.FLASH_ATTENTION, SDPBackend.EFFICIENT_ATTENTION])
+
     def generate(
         self,
         prompt: str,
@@ -139,6 +283,7 @@ class FluxGenerator:
         width: Optional[int] = None,
         num_inference_steps: Optional[int] = None,
         seed: Optional[int] = None,
+        step_callback: Optional[Callable[[int, int], None]] = None,
     ) -> Image.Image:
         """
         Generate an image from a text prompt.
@@ -150,6 +295,8 @@ class FluxGenerator:
             num_inference_steps: Number of denoising steps (default: 4)
                                More steps = higher quality but slower
             seed: Random seed for reproducibility (optional)
+            step_callback: Called after each denoising step with
+                (completed_steps, total_steps), from the generating thread
 
         Returns:
             PIL Image object
@@ -166,17 +313,9 @@ class FluxGenerator:
             ...     seed=42
             ... )
         """
-        if not prompt or not prompt.strip():
-            raise ValueError("Prompt cannot be empty")
-
-        # Use config defaults if not specified
-        height = height or self.config["default_size"][0]
-        width = width or self.config["default_size"][1]
-        num_inference_steps = num_inference_steps or self.config["default_steps"]
-
-        # Validate dimensions (must be multiples of 8 for most diffusion models)
-        if height % 8 != 0 or width % 8 != 0:
-            logger.warning(f"Height and width should be multiples of 8. Got {height}x{width}")
+        height, width, num_inference_steps = self._resolve_inputs(
+            [prompt], height, width, num_inference_steps
+        )
 
         logger.info(f"Generating image: '{prompt[:50]}...' ({height}x{width}, {num_inference_steps} steps)")
 
@@ -189,25 +328,25 @@ class FluxGenerator:
                 generator = torch.Generator(device=self.device).manual_seed(seed)
                 logger.info(f"Using seed: {seed}")
 
+            # Optional per-step progress hook
+            callback_kwargs = {}
+            if step_callback is not None:
+                def on_step_end(pipe, step_index, timestep, kwargs):
+                    step_callback(step_index + 1, num_inference_steps)
+                    return kwargs
+
+                callback_kwargs["callback_on_step_end"] = on_step_end
+
             # Generate image
-            # FLUX doesn't use guidance_scale, but SDXL does
-            if "flux" in self.model_id.lower():
+            with self._attention_context():
                 output = self.pipeline(
                     prompt=prompt,
                     height=height,
                     width=width,
                     num_inference_steps=num_inference_steps,
                     generator=generator,
-                )
-            else:
-                # SDXL uses guidance_scale
-                output = self.pipeline(
-                    prompt=prompt,
-                    height=height,
-                    width=width,
-                    num_inference_steps=num_inference_steps,
-                    guidance_scale=self.config.get("guidance_scale", 7.5),
-                    generator=generator,
+                    **self._pipeline_kwargs,
+                    **callback_kwargs,
                 )
 
             image = output.images[0]
@@ -260,9 +399,9 @@ class FluxGenerator:
             raise ValueError("Prompt cannot be empty")
 
         # Use config defaults if not specified
-        height = height or self.config["default_size"][0]
-        width = width or self.config["default_size"][1]
-        num_inference_steps = num_inference_steps or self.config.get("default_steps", 30)
+        height = height or self._default_height
+        width = width or self._default_width
+        num_inference_steps = num_inference_steps or self._default_steps
 
         logger.info(f"Generating progressive visualization: '{prompt[:50]}...' ({num_inference_steps} steps)")
 
@@ -302,25 +441,15 @@ class FluxGenerator:
                 logger.info(f"Using seed: {seed}")
 
             # Generate with callback
-            if "flux" in self.model_id.lower():
-                output = self.pipeline(
-                    prompt=prompt,
-                    height=height,
-                    width=width,
-                    num_inference_steps=num_inference_steps,
-                    generator=generator,
-                    callback_on_step_end=step_callback,
-                )
-            else:
-                # SDXL uses guidance_scale
+            with self._attention_context():
                 output = self.pipeline(
                     prompt=prompt,
                     height=height,
                     width=width,
                     num_inference_steps=num_inference_steps,
-                    guidance_scale=self.config.get("guidance_scale", 7.5),
                     generator=generator,
                     callback_on_step_end=step_callback,
+                    **self._pipeline_kwargs,
                 )
 
             final_image = output.images[0]
@@ -393,7 +522,7 @@ class FluxGenerator:
                 )
 
         # Use defaults
-        num_inference_steps = num_inference_steps or self.config["default_steps"]
+        num_inference_steps = num_inference_steps or self._default_steps
 
         # Generate
         generator = None
@@ -402,14 +531,15 @@ class FluxGenerator:
 
         logger.info(f"Img2img: '{prompt[:50]}...' (strength={strength})")
 
-        output = self.img2img_pipeline(
-            prompt=prompt,
-            image=init_image,
-            strength=strength,
-            num_inference_steps=num_inference_steps,
-            guidance_scale=self.config.get("guidance_scale", 7.5),
-            generator=generator,
-        )
+        with self._attention_context():
+            output = self.img2img_pipeline(
+                prompt=prompt,
+                image=init_image,
+                strength=strength,
+                num_inference_steps=num_inference_steps,
+                guidance_scale=self._guidance_scale,
+                generator=generator,
+            )
 
         return output.images[0]
 
@@ -420,6 +550,7 @@ class FluxGenerator:
         width: Optional[int] = None,
         num_inference_steps: Optional[int] = None,
         seed: Optional[int] = None,
+        batch_size: int = 1,
     ) -> list[Image.Image]:
         """
         Generate multiple images from a list of prompts.
@@ -433,10 +564,20 @@ class FluxGenerator:
             width: Output width in pixels (default: 1024)
             num_inference_steps: Number of denoising steps (default: 4)
             seed: Random seed for reproducibility (optional)
+            batch_size: Prompts denoised together in one pipeline call. Larger
+                batches use the GPU better but need proportionally more memory.
+                Each image gets its own generator seeded with ``seed``, i.e. the
+                same per-image seeds as batch_size=1 (batched kernels are not
+                bit-identical, so pixels may differ slightly).
 
         Returns:
             List of PIL Image objects
 
+        Raises:
+            ValueError: If the list or a prompt is empty, or the size is not a
+                multiple of 8 (checked up front for every batch_size)
+            RuntimeError: If generation fails
+
         Example:
             >>> gen = FluxGenerator()
             >>> images = gen.generate_batch([
@@ -447,20 +588,54 @@ class FluxGenerator:
         """
         if not prompts:
             raise ValueError("Prompts list cannot be empty")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
 
         logger.info(f"Generating {len(prompts)} images in batch")
 
+        if batch_size == 1:
+            images = []
+            for i, prompt in enumerate(prompts, 1):
+                logger.info(f"[{i}/{len(prompts)}] Generating: {prompt[:50]}...")
+                image = self.generate(
+                    prompt=prompt,
+                    height=height,
+                    width=width,
+                    num_inference_steps=num_inference_steps,
+                    seed=seed
+                )
+                images.append(image)
+
+            return images
+
+        height, width, num_inference_steps = self._resolve_inputs(
+            prompts, height, width, num_inference_steps
+        )
+
         images = []
-        for i, prompt in enumerate(prompts, 1):
-            logger.info(f"[{i}/{len(prompts)}] Generating: {prompt[:50]}...")
-            image = self.generate(
-                prompt=prompt,
-                height=height,
-                width=width,
-                num_inference_steps=num_inference_steps,
-                seed=seed
-            )
-            images.append(image)
+        for start in range(0, len(prompts), batch_size):
+            chunk = prompts[start:start + batch_size]
+            logger.info(f"[{start + 1}-{start + len(chunk)}/{len(prompts)}] Generating {len(chunk)} images together")
+
+            generator = None
+            if seed is not None:
+                generator = [torch.Generator(device=self.device).manual_seed(seed) for _ in chunk]
+
+            try:
+                with self._attention_context():
+                    output = self.pipeline(
+                        prompt=chunk,
+                        height=height,
+                        width=width,
+                        num_inference_steps=num_inference_steps,
+                        generator=generator,
+                        **self._pipeline_kwargs,
+                    )
+            except Exception as e:
+                logger.error(f"Batch generation failed: {e}")
+                raise RuntimeError(f"Image generation failed: {e}")
+
+            images.extend(output.images)
 
         return images
 
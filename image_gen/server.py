@@ -15,7 +15,9 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from pathlib import Path
 import logging
+import asyncio
 import base64
+import os
 from io import BytesIO
 
 from image_gen.core import ImageGenerator
@@ -43,6 +45,32 @@ def get_generator() -> ImageGenerator:
     return _generator
 
 
+@app.on_event("startup")
+async def warmup_generator():
+    """
+    Pre-load the model and run a one-step dummy generation at startup.
+
+    Moves model loading and kernel/algorithm selection off the first real
+    request. Uvicorn serves nothing until startup hooks finish, so with
+    WARMUP_AT_STARTUP=1 the server only starts accepting requests once the
+    warmup completes; it is opt-in so dev reloads stay fast.
+    """
+    if os.environ.get("WARMUP_AT_STARTUP") != "1":
+        return
+
+    logger.info("Warming up generator (WARMUP_AT_STARTUP=1)...")
+    try:
+        gen = get_generator()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None,
+            lambda: gen.generate("warmup prompt", num_inference_steps=1, auto_save=False)
+        )
+        logger.info("✓ Generator warmed up")
+    except Exception as e:
+        logger.warning(f"Warmup failed, first request will load the model: {e}")
+
+
 # Request/Response models
 class GenerateRequest(BaseModel):
     """Request model for single image generation."""
@@ -190,14 +218,8 @@ async def generate(request: GenerateRequest):
         )
 
         # Get the saved path
-        config = get_config()
-        output_dir = Path(config.output["directory"])
-
-        # Find the most recently created file
-        files = sorted(output_dir.glob("*.png"), key=lambda p: p.stat().st_mtime, reverse=True)
-        if files:
-            image_path = files[0]
-        else:
+        image_path = gen.last_saved_path
+        if image_path is None:
             raise RuntimeError("Image was generated but file not found")
 
         response_data = {
@@ -250,11 +272,6 @@ async def generate_batch(request: BatchGenerateRequest):
 
         gen = get_generator()
 
-        # Track file count before generation
-        config = get_config()
-        output_dir = Path(config.output["directory"])
-        existing_files = set(output_dir.glob("*.png"))
-
         # Generate batch
         images = gen.generate_batch(
             prompts=request.prompts,
@@ -265,11 +282,7 @@ async def generate_batch(request: BatchGenerateRequest):
             auto_save=True
         )
 
-        # Find newly created files
-        all_files = set(output_dir.glob("*.png"))
-        new_files = sorted(all_files - existing_files, key=lambda p: p.stat().st_mtime)
-
-        image_paths = [str(f) for f in new_files]
+        image_paths = [str(f) for f in gen.last_saved_paths]
 
         return BatchGenerateResponse(
             success=True,
@@ -352,6 +365,10 @@ def run_server(
         reload: Enable auto-reload for development
     """
     import uvicorn
+    from image_gen.utils.device import configure_compile_cache
+
+    # Reuse compiled kernels from previous runs (inherited by reload workers)
+    configure_compile_cache(get_config().cache_dir)
 
     logger.info(f"Starting ImageGeneratorLLM API server on {host}:{port}")
 
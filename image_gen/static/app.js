@@ -0,0 +1,881 @@
+/*
+ * ImageGeneratorLLM visualization UI.
+ * Loaded by index.html; the server adds a content-hash query string so the
+ * browser can cache this file indefinitely.
+ */
+
+let ws = null;
+let startTime = null;
+let generating = false;
+
+// Global state
+let currentMode = 'text2img';
+let uploadedImage = null;
+
+// The pipeline diagram is static markup: look its nodes up once
+// instead of re-querying the whole document on every update
+const pipelineArrows = Array.from(document.querySelectorAll('.h-arrow'));
+const cornerConnector = document.querySelector('.corner-connector');
+// component name -> the component and the children updates write to
+const compIndex = new Map();
+document.querySelectorAll('.component').forEach(comp => {
+    compIndex.set(comp.dataset.component, {
+        root: comp,
+        timing: comp.querySelector('.component-timing'),
+        percent: comp.querySelector('.component-percentage'),
+        progress: comp.querySelector('.progress-bar')
+    });
+});
+// What updatePipeline last marked active, so only changed nodes are touched
+let lastActive = null;
+let lastArrowCount = 0;
+
+// Elements written on every WebSocket message
+const STAGE_IDS = ['stageInput', 'stageEncoding', 'stageProcessing', 'stageDecoding', 'stageOutput'];
+const DOM = {
+    status: document.getElementById('status'),
+    apiCallDetails: document.getElementById('apiCallDetails'),
+    generateBtn: document.getElementById('generateBtn'),
+    progressDisplay: document.getElementById('progressDisplay'),
+    estRemaining: document.getElementById('estRemaining'),
+    elapsedTime: document.getElementById('elapsedTime'),
+    timePerStep: document.getElementById('timePerStep'),
+    perfTotalTime: document.getElementById('perfTotalTime'),
+    perfImageSize: document.getElementById('perfImageSize'),
+    perfSteps: document.getElementById('perfSteps'),
+    perfTimePerStep: document.getElementById('perfTimePerStep'),
+    stages: {}
+};
+// API call text goes into this <pre> via textContent (no HTML parsing or
+// escaping); it replaces the placeholder on the first request
+DOM.apiCallPre = document.createElement('pre');
+DOM.apiCallPre.style.cssText = 'margin: 0; white-space: pre-wrap; color: #c9d1d9;';
+let lastApiCall = null;
+
+STAGE_IDS.forEach(stageId => {
+    DOM.stages[stageId] = {
+        time: document.getElementById(`${stageId}Time`),
+        pct: document.getElementById(`${stageId}Pct`),
+        bar: document.getElementById(`${stageId}Bar`)
+    };
+});
+// Stage breakdown: component name -> index into STAGE_IDS / STAGE_ELEMENTS
+const STAGE_ELEMENTS = STAGE_IDS.map(stageId => DOM.stages[stageId]);
+const COMPONENT_STAGE = new Map([
+    ['input', 0],
+    ['text-encode', 1],
+    ['text-embed', 1],
+    ['image-encode', 1],
+    ['diffusion', 2],
+    ['vae-decode', 3],
+    ['output', 4]
+]);
+
+// Pipeline tooltips: one shared element filled from the hovered
+// component's data-tooltip-* attributes (event delegation)
+const pipelineTooltip = document.getElementById('pipelineTooltip');
+const tooltipTitle = pipelineTooltip.querySelector('.tooltip-title');
+const tooltipDesc = pipelineTooltip.querySelector('.tooltip-desc');
+const tooltipTech = pipelineTooltip.querySelector('.tooltip-tech');
+let tooltipComponent = null;
+
+function hidePipelineTooltip() {
+    tooltipComponent = null;
+    pipelineTooltip.classList.remove('visible');
+}
+
+const pipelineEl = document.getElementById('pipeline');
+pipelineEl.addEventListener('mouseover', (e) => {
+    const comp = e.target.closest('.component');
+    if (comp === tooltipComponent) return;
+    if (!comp || !comp.dataset.tooltipTitle) {
+        hidePipelineTooltip();
+        return;
+    }
+
+    tooltipComponent = comp;
+    tooltipTitle.innerHTML = comp.dataset.tooltipTitle;
+    tooltipDesc.innerHTML = comp.dataset.tooltipDesc || '';
+    tooltipTech.innerHTML = comp.dataset.tooltipTech || '';
+
+    const rect = comp.getBoundingClientRect();
+    pipelineTooltip.style.left = `${rect.left + rect.width / 2}px`;
+    pipelineTooltip.style.top = `${rect.top}px`;
+    pipelineTooltip.classList.add('visible');
+});
+pipelineEl.addEventListener('mouseleave', hidePipelineTooltip);
+window.addEventListener('scroll', hidePipelineTooltip, { passive: true });
+
+// Mode membership of every [data-path] node as a bitmask, parsed once
+const MODE_BITS = {
+    text2img: 1, img2img: 2, controlnet: 4, llm: 8,
+    text2audio: 16, audio2text: 32, text2video: 64, img2video: 128
+};
+const PATH_ALL = 0xFFFFFFFF;  // data-path="all": active in every mode
+
+function pathMask(path) {
+    let mask = 0;
+    for (const name of path.split(',')) {
+        mask |= name === 'all' ? PATH_ALL : (MODE_BITS[name] || 0);
+    }
+    return mask >>> 0;
+}
+
+const pathNodes = Array.from(document.querySelectorAll('[data-path]'));
+const pathMasks = Uint32Array.from(pathNodes, el => pathMask(el.dataset.path));
+const flowchartRows = Array.from(document.querySelectorAll('.flowchart-row'));
+const rowMasks = Uint32Array.from(flowchartRows, row =>
+    Array.from(row.querySelectorAll('[data-path]'))
+        .reduce((mask, el) => mask | pathMask(el.dataset.path), 0) >>> 0
+);
+
+function isPathActive(mask, bit) {
+    return mask === PATH_ALL || (mask & bit) !== 0;
+}
+
+// Update block diagram visualization based on mode
+function updateBlockDiagram(mode) {
+    // Comprehensive multi-path flowchart: show all paths, activate only the current one
+    console.log(`Updating flowchart for mode: ${mode}`);
+    const bit = MODE_BITS[mode] || 0;
+
+    // Update all components based on their data-path mask
+    for (let i = 0; i < pathNodes.length; i++) {
+        const isActive = isPathActive(pathMasks[i], bit);
+        pathNodes[i].classList.toggle('active', isActive);
+        pathNodes[i].classList.toggle('inactive', !isActive);
+    }
+
+    // Also update rows to fade out if no active components in them
+    for (let i = 0; i < flowchartRows.length; i++) {
+        flowchartRows[i].style.opacity = isPathActive(rowMasks[i], bit) ? '1' : '0.65';
+    }
+}
+
+// Toggle API Call expandable section
+function toggleApiCall() {
+    const content = document.getElementById('apiCallContent');
+    const arrow = document.getElementById('apiCallArrow');
+
+    if (content.classList.contains('expanded')) {
+        content.classList.remove('expanded');
+        arrow.classList.remove('expanded');
+    } else {
+        content.classList.add('expanded');
+        arrow.classList.add('expanded');
+    }
+}
+
+// Per-mode model details for the insights panel (built once, not per switch)
+const modelInfo = {
+    'text2img': {
+        name: 'Stable Diffusion XL',
+        architecture: 'Latent Diffusion',
+        parameters: '3.5B',
+        license: 'CreativeML OpenRAIL++',
+        modality: 'Text → Image',
+        insights: 'SDXL uses dual text encoders (CLIP ViT-L/14 and OpenCLIP ViT-G/14) for enhanced prompt understanding. The latent diffusion approach processes images in compressed 8x8 pixel blocks, making it ~8x faster than pixel-space diffusion while maintaining high quality.'
+    },
+    'img2img': {
+        name: 'Stable Diffusion XL',
+        architecture: 'Latent Diffusion',
+        parameters: '3.5B',
+        license: 'CreativeML OpenRAIL++',
+        modality: 'Image → Image',
+        insights: 'Image-to-image mode starts from your input image rather than pure noise. The "strength" parameter controls how much the original image is preserved (0.0 = no change, 1.0 = complete transformation). Lower strength values (0.3-0.5) are good for subtle modifications, while higher values (0.7-0.9) allow major changes.'
+    },
+    'controlnet': {
+        name: 'Stable Diffusion XL + ControlNet',
+        architecture: 'Conditioned Latent Diffusion',
+        parameters: '3.5B + 1.2B',
+        license: 'CreativeML OpenRAIL++',
+        modality: 'Structure-Guided Generation',
+        insights: 'ControlNet adds spatial conditioning to SDXL, allowing precise control over composition using edge maps, depth maps, or pose skeletons. The control structure guides the diffusion process while the text prompt defines the content, enabling highly controllable image generation.'
+    },
+    'llm': {
+        name: 'Language Model',
+        architecture: 'Transformer Decoder',
+        parameters: '7B - 70B+',
+        license: 'Various',
+        modality: 'Text → Text',
+        insights: 'Large Language Models use transformer-based architectures with attention mechanisms to generate coherent text. Modern LLMs can handle tasks like question answering, summarization, code generation, and creative writing through prompt-based interaction.'
+    },
+    'text2audio': {
+        name: 'Text-to-Speech Model',
+        architecture: 'Neural TTS',
+        parameters: '200M - 1B',
+        license: 'Various',
+        modality: 'Text → Audio',
+        insights: 'TTS models convert text to natural-sounding speech using neural vocoders. Modern approaches use transformers to model prosody (rhythm and intonation) and mel-spectrograms, then convert to waveforms using GAN-based or diffusion-based vocoders.'
+    },
+    'audio2text': {
+        name: 'Whisper (OpenAI)',
+        architecture: 'Encoder-Decoder Transformer',
+        parameters: '1.5B',
+        license: 'MIT',
+        modality: 'Audio → Text',
+        insights: 'Whisper uses a transformer encoder-decoder architecture trained on 680,000 hours of multilingual data. It can transcribe speech in 100+ languages, translate to English, and perform voice activity detection with state-of-the-art accuracy.'
+    },
+    'text2video': {
+        name: 'Video Diffusion Model',
+        architecture: 'Temporal Latent Diffusion',
+        parameters: '5B - 10B',
+        license: 'Various',
+        modality: 'Text → Video',
+        insights: 'Video diffusion models extend image diffusion to the temporal dimension, generating consistent frame sequences. They use 3D UNets or temporal attention layers to model motion and ensure temporal coherence across frames.'
+    },
+    'img2video': {
+        name: 'Video Diffusion Model',
+        architecture: 'Temporal Latent Diffusion',
+        parameters: '5B - 10B',
+        license: 'Various',
+        modality: 'Image → Video',
+        insights: 'Image-to-video models animate a single image by predicting plausible motion. They condition on the input frame and generate subsequent frames that maintain visual consistency while introducing realistic movement based on the text prompt.'
+    }
+};
+
+// Update Model Insights panel based on current mode
+function updateModelInsights(mode) {
+    const info = modelInfo[mode] || modelInfo['text2img'];
+
+    // Update model information card
+    document.getElementById('modelName').textContent = info.name;
+    document.getElementById('modelArchitecture').textContent = info.architecture;
+    document.getElementById('modelParameters').textContent = info.parameters;
+    document.getElementById('modelLicense').textContent = info.license;
+    document.getElementById('modelModality').textContent = info.modality;
+
+    // Update educational insights
+    document.getElementById('educationalInsights').innerHTML = `
+        <p style="margin: 0; font-size: 0.85em; line-height: 1.6; color: #c9d1d9;">
+            ${info.insights}
+        </p>
+    `;
+}
+
+// Update performance metrics panel
+function updatePerformanceMetrics(data) {
+    if (data.total_time) {
+        DOM.perfTotalTime.textContent = `${data.total_time.toFixed(2)}s`;
+    }
+    if (data.image_size) {
+        DOM.perfImageSize.textContent = data.image_size;
+    }
+    if (data.steps) {
+        DOM.perfSteps.textContent = data.steps;
+        if (data.total_time) {
+            const timePerStep = data.total_time / data.steps;
+            DOM.perfTimePerStep.textContent = `${timePerStep.toFixed(2)}s`;
+        }
+    }
+}
+
+// Update stage breakdown with timing data
+function updateStageBreakdown(stageTimings) {
+    if (!stageTimings) return;
+
+    const totalTime = stageTimings.total || 1;
+
+    // Sum up component times into stages
+    const totals = new Float64Array(STAGE_IDS.length);
+    for (const component in stageTimings) {
+        const idx = COMPONENT_STAGE.get(component);
+        if (idx !== undefined) totals[idx] += stageTimings[component];
+    }
+
+    // Update each stage
+    for (let idx = 0; idx < STAGE_ELEMENTS.length; idx++) {
+        const time = totals[idx];
+        const percentage = totalTime > 0 ? (time / totalTime * 100) : 0;
+        const { time: timeEl, pct: pctEl, bar: barEl } = STAGE_ELEMENTS[idx];
+
+        if (timeEl) timeEl.textContent = `${time.toFixed(2)}s`;
+        if (pctEl) pctEl.textContent = `${percentage.toFixed(1)}%`;
+        if (barEl) barEl.style.width = `${percentage}%`;
+    }
+}
+
+// Creative prompts for each mode (randomized on mode switch)
+const creativePrompts = {
+    text2img: [
+        "a cyberpunk cityscape at sunset with neon lights reflecting on wet streets",
+        "a majestic dragon perched on a mountain peak overlooking misty valleys",
+        "an astronaut floating in a garden of bioluminescent flowers in space",
+        "a steampunk airship soaring through clouds above a Victorian city",
+        "a cozy library with floating books and magical glowing orbs",
+        "a mystical forest with giant mushrooms and fairy lights at twilight",
+        "a futuristic sports car racing through a tunnel of light and energy",
+        "an ancient temple hidden in a jungle with golden sunlight streaming through vines",
+        "a peaceful zen garden with a koi pond and cherry blossoms in full bloom",
+        "a retro-futuristic diner on Mars with robots serving milkshakes",
+        "a massive whale swimming through clouds above a sunset ocean",
+        "a crystal cave filled with rainbow-colored geodes and underground waterfalls",
+        "a medieval knight's armor displayed in a grand hall with dramatic lighting",
+        "a colorful hot air balloon festival at dawn over rolling hills",
+        "a underwater research station surrounded by curious sea creatures and coral reefs"
+    ],
+    text2audio: [
+        "gentle rain falling on a tin roof with distant thunder",
+        "a jazz saxophone solo in a smoky nightclub",
+        "ocean waves crashing on a rocky shore with seagulls calling",
+        "a crackling campfire with crickets chirping in the background",
+        "a busy coffee shop with espresso machines and quiet conversations",
+        "medieval tavern ambience with lute music and cheerful chatter",
+        "spaceship engine humming while traveling through hyperspace",
+        "a thunderstorm with heavy rain and frequent lightning cracks"
+    ],
+    text2video: [
+        "a time-lapse of clouds forming into a dramatic storm over the ocean",
+        "a flower blooming from bud to full bloom in accelerated time",
+        "a bustling Tokyo street at night with neon signs and pedestrians",
+        "a camera flying through a futuristic city with flying cars and skyscrapers",
+        "a waterfall freezing and thawing in a seasonal time-lapse",
+        "northern lights dancing across a starry Arctic sky"
+    ],
+    llm: [
+        "Explain quantum entanglement like I'm a curious 10-year-old",
+        "Write a haiku about artificial intelligence",
+        "What would happen if gravity suddenly became twice as strong?",
+        "Create a short story about a time-traveling detective"
+    ],
+    audio2text: [
+        "(Upload or speak: a podcast episode, lecture, or voice note to transcribe)",
+        "(Upload audio: interview, meeting recording, or musical performance to analyze)"
+    ]
+};
+
+// Image-based prompts that reference existing images in outputs/
+const imageBasedPrompts = {
+    img2img: [
+        "transform this image into a watercolor painting with soft, flowing brushstrokes",
+        "convert to a dramatic black and white photograph with high contrast",
+        "reimagine as a vibrant pop art piece with bold colors and comic book styling",
+        "add a mystical fog and fantasy lighting to create an ethereal atmosphere",
+        "transform into a vintage 1920s photograph with sepia tones and grain",
+        "make it look like an oil painting by Van Gogh with swirling, expressive strokes",
+        "add a sunset color palette with warm oranges and purples",
+        "convert to a cyberpunk aesthetic with neon highlights and futuristic elements",
+        "transform into a pencil sketch with delicate shading and fine details",
+        "add dramatic storm clouds and moody lighting"
+    ],
+    img2video: [
+        "create a gentle camera pan across this scene from left to right",
+        "add subtle parallax effect to create depth and dimension",
+        "animate with a slow zoom-in while adding particles or snow falling",
+        "create a cinemagraph where one element moves (water, clouds, or fabric)",
+        "add a gentle breathing effect to make the image feel alive",
+        "create a rotating camera movement around the main subject"
+    ],
+    controlnet: [
+        "create a photorealistic portrait following the pose and structure",
+        "transform the structure into a fantasy landscape with mountains and castles",
+        "convert the structural outline into a futuristic architecture design",
+        "use the edge structure to create an anime-style character illustration"
+    ]
+};
+
+// Function to get a random item from an array
+function getRandomItem(array) {
+    return array[Math.floor(Math.random() * array.length)];
+}
+
+// Function to set a random creative prompt based on mode
+function setRandomPrompt(mode) {
+    const promptField = document.getElementById('prompt');
+
+    // Determine which prompt list to use
+    let promptList;
+    if (mode === 'img2img' || mode === 'img2video' || mode === 'controlnet') {
+        promptList = imageBasedPrompts[mode] || creativePrompts.text2img;
+    } else {
+        promptList = creativePrompts[mode] || creativePrompts.text2img;
+    }
+
+    // Set random prompt
+    const randomPrompt = getRandomItem(promptList);
+    promptField.value = randomPrompt;
+}
+
+// Switch generation mode
+function switchMode(mode) {
+    currentMode = mode;
+
+    // Update mode buttons
+    document.querySelectorAll('.mode-btn').forEach(btn => {
+        btn.classList.toggle('active', btn.dataset.mode === mode);
+    });
+
+    // Update block diagram visualization
+    updateBlockDiagram(mode);
+
+    // Update model insights panel
+    updateModelInsights(mode);
+
+    // Show/hide image upload
+    const imageUpload = document.getElementById('imageUpload');
+    if (mode === 'img2img' || mode === 'controlnet' || mode === 'img2video') {
+        imageUpload.classList.add('visible');
+    } else {
+        imageUpload.classList.remove('visible');
+    }
+
+    // Set random creative prompt for the new mode
+    setRandomPrompt(mode);
+
+    console.log(`Switched to ${mode} mode`);
+}
+
+// Handle image upload
+function handleImageUpload(event) {
+    const file = event.target.files[0];
+    if (file) {
+        const reader = new FileReader();
+        reader.onload = function(e) {
+            uploadedImage = e.target.result;
+
+            // Show preview from a blob URL rather than re-parsing the
+            // (multi-MB) data URL; decoding="async" keeps decode off the main thread
+            const preview = document.getElementById('uploadPreview');
+            if (preview.src.startsWith('blob:')) URL.revokeObjectURL(preview.src);
+            preview.src = URL.createObjectURL(file);
+            preview.style.display = 'block';
+
+            // Hide upload text
+            document.getElementById('uploadText').style.display = 'none';
+
+            // Update upload zone styling
+            document.getElementById('uploadZone').classList.add('has-image');
+
+            console.log('Image uploaded successfully');
+        };
+        reader.readAsDataURL(file);
+    }
+}
+
+// Update parameter display
+function updateParamDisplay() {
+    const steps = document.getElementById('steps').value;
+    const guidance = document.getElementById('guidance').value;
+    const seed = document.getElementById('seed').value || 'random';
+    const size = document.getElementById('imageSize').value;
+
+    document.getElementById('param-steps').textContent = steps;
+    document.getElementById('param-guidance').textContent = guidance;
+    document.getElementById('param-seed').textContent = seed;
+    document.getElementById('param-size').textContent = size.replace('x', '×');
+}
+
+// Apply slider changes at most once per frame while dragging
+function onRangeInput(id, update) {
+    const input = document.getElementById(id);
+    let rafId = 0;
+    input.addEventListener('input', () => {
+        if (rafId) return;
+        rafId = requestAnimationFrame(() => {
+            rafId = 0;
+            update(input.value);
+        });
+    });
+}
+
+// Update steps display
+onRangeInput('steps', (steps) => {
+    document.getElementById('stepsValue').textContent = steps;
+    // Sync with Performance Summary
+    DOM.perfSteps.textContent = steps;
+    // Update progress display
+    DOM.progressDisplay.textContent = `0/${steps}`;
+    updateParamDisplay();
+});
+
+// Update guidance display
+onRangeInput('guidance', (guidance) => {
+    document.getElementById('guidanceValue').textContent = guidance;
+    updateParamDisplay();
+});
+
+// Update size display
+document.getElementById('imageSize').addEventListener('change', (e) => {
+    // Sync with Performance Summary
+    DOM.perfImageSize.textContent = e.target.value.replace('x', '×');
+    updateParamDisplay();
+});
+
+// Update seed display
+document.getElementById('seed').addEventListener('input', () => {
+    updateParamDisplay();
+});
+
+// Minimal MessagePack decoder for the server's state frames (maps, arrays,
+// strings, numbers, booleans and nil)
+function decodeMsgpack(buffer) {
+    const view = new DataView(buffer);
+    const bytes = new Uint8Array(buffer);
+    let pos = 0;
+
+    function str(length) {
+        const value = wsDecoder.decode(bytes.subarray(pos, pos + length));
+        pos += length;
+        return value;
+    }
+    function array(length) {
+        const value = new Array(length);
+        for (let i = 0; i < length; i++) value[i] = read();
+        return value;
+    }
+    function map(length) {
+        const value = {};
+        for (let i = 0; i < length; i++) {
+            const key = read();
+            value[key] = read();
+        }
+        return value;
+    }
+    function take(size, get) {
+        const value = get.call(view, pos);
+        pos += size;
+        return value;
+    }
+    function read() {
+        const type = bytes[pos++];
+        if (type < 0x80) return type;
+        if (type < 0x90) return map(type & 0x0f);
+        if (type < 0xa0) return array(type & 0x0f);
+        if (type < 0xc0) return str(type & 0x1f);
+        if (type >= 0xe0) return type - 0x100;
+        switch (type) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xca: return take(4, view.getFloat32);
+            case 0xcb: return take(8, view.getFloat64);
+            case 0xcc: return take(1, view.getUint8);
+            case 0xcd: return take(2, view.getUint16);
+            case 0xce: return take(4, view.getUint32);
+            case 0xcf: return Number(take(8, view.getBigUint64));
+            case 0xd0: return take(1, view.getInt8);
+            case 0xd1: return take(2, view.getInt16);
+            case 0xd2: return take(4, view.getInt32);
+            case 0xd3: return Number(take(8, view.getBigInt64));
+            case 0xd9: return str(take(1, view.getUint8));
+            case 0xda: return str(take(2, view.getUint16));
+            case 0xdb: return str(take(4, view.getUint32));
+            case 0xdc: return array(take(2, view.getUint16));
+            case 0xdd: return array(take(4, view.getUint32));
+            case 0xde: return map(take(2, view.getUint16));
+            case 0xdf: return map(take(4, view.getUint32));
+            default: throw new Error(`Unsupported MessagePack type 0x${type.toString(16)}`);
+        }
+    }
+    return read();
+}
+
+// Connect to WebSocket
+const wsDecoder = new TextDecoder();
+
+function decodeFrame(event) {
+    if (typeof event.data === 'string') return JSON.parse(event.data);
+    if (ws.protocol === 'msgpack') return decodeMsgpack(event.data);
+    return JSON.parse(wsDecoder.decode(event.data));
+}
+
+function connectWebSocket() {
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    // Ask for MessagePack frames; a server without msgpack installed accepts
+    // without a subprotocol and sends UTF-8 JSON bytes instead
+    ws = new WebSocket(`${protocol}//${window.location.host}/ws`, ['msgpack']);
+    ws.binaryType = 'arraybuffer';
+
+    ws.onopen = () => {
+        console.log('WebSocket connected');
+    };
+
+    ws.onmessage = (event) => {
+        const data = decodeFrame(event);
+        if (data.type === 'batch') {
+            data.items.forEach(schedulePipelineUpdate);
+        } else {
+            schedulePipelineUpdate(data);
+        }
+    };
+
+    ws.onerror = (error) => {
+        console.error('WebSocket error:', error);
+    };
+
+    ws.onclose = () => {
+        console.log('WebSocket disconnected');
+        cancelPipelineUpdates();
+        setTimeout(connectWebSocket, 2000);
+    };
+}
+
+// Batch DOM writes: apply the messages received since the last frame in one pass
+let pendingUpdates = [];
+let pendingFrame = 0;
+
+function schedulePipelineUpdate(data) {
+    if (pendingUpdates.push(data) === 1) {
+        pendingFrame = requestAnimationFrame(flushPipelineUpdates);
+    }
+}
+
+function cancelPipelineUpdates() {
+    cancelAnimationFrame(pendingFrame);
+    pendingFrame = 0;
+    pendingUpdates = [];
+}
+
+function flushPipelineUpdates() {
+    const updates = pendingUpdates;
+    pendingFrame = 0;
+    pendingUpdates = [];
+    updates.forEach((data, i) => {
+        // A plain progress tick followed by a newer one for the same
+        // component would be overwritten within this frame: skip it.
+        // Messages carrying one-off fields are always applied.
+        const next = updates[i + 1];
+        if (next && next.component === data.component &&
+            !data.api_call && !data.component_timing && !data.component_percentages) {
+            return;
+        }
+        updatePipeline(data);
+    });
+}
+
+function updatePipeline(data) {
+    const { component, progress, total, message, metrics = {}, api_call, component_timing, component_percentages } = data;
+
+    // Update API call details if present
+    if (api_call && api_call !== lastApiCall) {
+        DOM.apiCallPre.textContent = api_call;
+        if (DOM.apiCallPre.parentNode !== DOM.apiCallDetails) {
+            DOM.apiCallDetails.replaceChildren(DOM.apiCallPre);
+        }
+        lastApiCall = api_call;
+    }
+
+    // Handle component timing updates
+    if (component_timing) {
+        updateComponentTiming(component_timing.component, component_timing.elapsed_time);
+    }
+
+    // Handle final percentage calculations
+    if (component_percentages) {
+        updateComponentPercentages(component_percentages);
+    }
+
+    // Detail-only messages (e.g. the API call text) carry no pipeline state
+    if (component === undefined) return;
+
+    // Update status
+    DOM.status.textContent = message;
+    DOM.status.className = component !== 'idle' ? 'status active' : 'status';
+
+    // Update components
+    const entry = compIndex.get(component);
+    if (lastActive !== component) {
+        const previous = compIndex.get(lastActive);
+        if (previous) previous.root.classList.remove('active');
+        if (entry) entry.root.classList.add('active');
+        lastActive = component;
+    }
+    if (entry && entry.progress) {
+        if (total > 0) {
+            const percent = (progress / total) * 100;
+            entry.progress.style.width = percent + '%';
+        } else {
+            entry.progress.style.width = '100%';
+        }
+    }
+
+    // Update arrows based on active component: arrows before the
+    // current index are active, and only the ones between the old
+    // and new boundary change
+    const componentOrder = ['input', 'api', 'loading', 'encoding', 'diffusion', 'saving', 'complete'];
+    const currentIndex = componentOrder.indexOf(component);
+    const arrowCount = Math.min(Math.max(currentIndex, 0), pipelineArrows.length);
+
+    if (arrowCount !== lastArrowCount) {
+        const lo = Math.min(arrowCount, lastArrowCount);
+        const hi = Math.max(arrowCount, lastArrowCount);
+        for (let idx = lo; idx < hi; idx++) {
+            pipelineArrows[idx].classList.toggle('active', idx < arrowCount);
+        }
+        lastArrowCount = arrowCount;
+    }
+
+    // Update corner connector
+    if (cornerConnector) {
+        if (currentIndex >= 4) { // After encoding, show active
+            cornerConnector.style.background = 'linear-gradient(180deg, #66bb6a, #4a8f4e)';
+            cornerConnector.style.boxShadow = '0 0 8px rgba(102, 187, 106, 0.6)';
+        } else {
+            cornerConnector.style.background = 'linear-gradient(180deg, #4fc3f7, #3a5f7f)';
+            cornerConnector.style.boxShadow = '0 0 6px rgba(79, 195, 247, 0.4)';
+        }
+    }
+
+    // Update metrics
+    if (total > 0) {
+        DOM.progressDisplay.textContent = `${progress}/${total}`;
+
+        // Calculate estimated remaining time
+        if (metrics.time_per_step && progress > 0) {
+            const remaining = (total - progress) * metrics.time_per_step;
+            if (remaining > 60) {
+                DOM.estRemaining.textContent = `${Math.floor(remaining / 60)}m ${Math.floor(remaining % 60)}s`;
+            } else {
+                DOM.estRemaining.textContent = `${Math.floor(remaining)}s`;
+            }
+        }
+    }
+
+    if (metrics.elapsed_time) {
+        DOM.elapsedTime.textContent = metrics.elapsed_time.toFixed(1) + 's';
+    }
+    if (metrics.time_per_step) {
+        DOM.timePerStep.textContent = metrics.time_per_step.toFixed(2) + 's';
+    }
+
+    // Mark completed components
+    if (component === 'complete') {
+        generating = false;
+        document.body.classList.remove('generating');
+        DOM.generateBtn.disabled = false;
+        compIndex.forEach(entry => {
+            entry.root.classList.add('completed');
+            if (entry.progress) {
+                entry.progress.style.width = '100%';
+            }
+        });
+    }
+}
+
+// Update component timing display
+function updateComponentTiming(componentName, elapsedTime) {
+    const entry = compIndex.get(componentName);
+    if (entry && entry.timing) {
+        entry.timing.textContent = `${elapsedTime.toFixed(2)}s`;
+    }
+}
+
+// Update component percentages after generation completes
+function updateComponentPercentages(percentages) {
+    for (const [componentName, percentage] of Object.entries(percentages)) {
+        const entry = compIndex.get(componentName);
+        if (entry && entry.percent) {
+            entry.percent.textContent = `${percentage.toFixed(1)}%`;
+            entry.percent.classList.add('visible');
+        }
+    }
+}
+
+// Timeline function removed - using Pipeline Stage Breakdown instead
+
+// Handle form submission
+document.getElementById('generateForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    if (generating) return;
+
+    generating = true;
+    document.body.classList.add('generating');
+    startTime = Date.now();
+    DOM.generateBtn.disabled = true;
+
+    // Reset pipeline (frames still queued from the previous run are stale).
+    // All writes happen in this one task with no layout reads in between;
+    // empty text nodes are left alone
+    cancelPipelineUpdates();
+    for (const entry of compIndex.values()) {
+        entry.root.classList.remove('active', 'completed');
+        if (entry.progress) {
+            entry.progress.style.width = '0%';
+        }
+        // Clear timing and percentage displays
+        if (entry.timing && entry.timing.textContent) entry.timing.textContent = '';
+        if (entry.percent) {
+            if (entry.percent.textContent) entry.percent.textContent = '';
+            entry.percent.classList.remove('visible');
+        }
+    }
+
+    // Reset arrows
+    pipelineArrows.forEach(arrow => {
+        arrow.classList.remove('active');
+    });
+    lastActive = null;
+    lastArrowCount = 0;
+
+    // Reset corner connector
+    if (cornerConnector) {
+        cornerConnector.style.background = 'linear-gradient(180deg, #4fc3f7, #3a5f7f)';
+        cornerConnector.style.boxShadow = '0 0 6px rgba(79, 195, 247, 0.4)';
+    }
+
+    const prompt = document.getElementById('prompt').value;
+    const steps = parseInt(document.getElementById('steps').value);
+    const guidance = parseFloat(document.getElementById('guidance').value);
+    const seed = document.getElementById('seed').value;
+    const sizeValue = document.getElementById('imageSize').value;
+    const [width, height] = sizeValue.split('x').map(v => parseInt(v));
+
+    try {
+        const response = await fetch('/generate', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                prompt,
+                mode: currentMode,
+                num_inference_steps: steps,
+                guidance_scale: guidance,
+                width: width,
+                height: height,
+                seed: seed ? parseInt(seed) : null,
+                init_image: uploadedImage  // Base64 encoded image
+            })
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            // Display model output based on mode
+            const outputDisplay = document.getElementById('outputDisplay');
+
+            if (currentMode === 'text2img' || currentMode === 'img2img' || currentMode === 'controlnet') {
+                outputDisplay.innerHTML = `<img src="/image/${result.filename}" alt="Generated image">`;
+            } else if (currentMode === 'text2video' || currentMode === 'img2video') {
+                outputDisplay.innerHTML = `<video controls><source src="/video/${result.filename}" type="video/mp4"></video>`;
+            } else if (currentMode === 'text2audio') {
+                outputDisplay.innerHTML = `<audio controls><source src="/audio/${result.filename}" type="audio/mpeg"></audio>`;
+            } else if (currentMode === 'audio2text' || currentMode === 'llm') {
+                outputDisplay.innerHTML = `<pre>${result.text || result.content}</pre>`;
+            }
+        } else {
+            console.error('Generation failed:', result.error);
+        }
+    } catch (error) {
+        console.error('Generation error:', error);
+        generating = false;
+        document.body.classList.remove('generating');
+        DOM.generateBtn.disabled = false;
+    }
+});
+
+// Event handlers (delegated for the mode buttons)
+document.querySelector('.mode-selector').addEventListener('click', (e) => {
+    const btn = e.target.closest('.mode-btn');
+    if (btn) switchMode(btn.dataset.mode);
+});
+document.getElementById('uploadZone').addEventListener('click', () => {
+    document.getElementById('fileInput').click();
+});
+document.getElementById('fileInput').addEventListener('change', handleImageUpload);
+document.querySelector('.api-call-toggle').addEventListener('click', toggleApiCall);
+
+// Initialize
+connectWebSocket();
+updateModelInsights('text2img'); // Initialize with default mode
+updateParamDisplay(); // Initialize parameter display
+setRandomPrompt('text2img'); // Set initial random prompt
@@ -7,8 +7,10 @@ Reference: See docs/architecture/DEVICE_MANAGEMENT.md
 """
 
 import torch
+from pathlib import Path
 from typing import Optional
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -131,6 +133,44 @@ def get_device_info() -> dict:
     return info
 
 
+def configure_compile_cache(cache_dir: Optional[str] = None) -> Path:
+    """
+    Persist the TorchInductor compile cache across process restarts.
+
+    Compiled kernels and FX graphs are stored in an ``inductor/`` directory
+    inside the model cache, next to the downloaded weights, so a restarted
+    server reuses them instead of recompiling from scratch. Existing
+    TORCHINDUCTOR_* environment variables take precedence.
+
+    Args:
+        cache_dir: Model cache directory (None = HuggingFace default ~/.cache/huggingface/)
+
+    Returns:
+        Path of the inductor cache directory in use
+
+    Example:
+        >>> from image_gen.config import get_config
+        >>> configure_compile_cache(get_config().cache_dir)
+        PosixPath('/Users/me/.cache/huggingface/inductor')
+    """
+    base_dir = Path(cache_dir) if cache_dir else Path.home() / ".cache" / "huggingface"
+    os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(base_dir / "inductor"))
+    os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+
+    try:
+        import torch._dynamo.config
+        import torch._inductor.config
+
+        torch._inductor.config.fx_graph_cache = os.environ["TORCHINDUCTOR_FX_GRAPH_CACHE"] == "1"
+        torch._dynamo.config.cache_size_limit = 64
+    except (ImportError, AttributeError) as e:
+        logger.warning(f"Could not configure inductor cache: {e}")
+
+    inductor_dir = Path(os.environ["TORCHINDUCTOR_CACHE_DIR"])
+    logger.info(f"Inductor compile cache: {inductor_dir}")
+    return inductor_dir
+
+
 def print_device_info() -> None:
     """
     Print formatted device information to console.
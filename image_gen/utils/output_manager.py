@@ -5,9 +5,40 @@ Automatically creates organized folder structures for image generation sessions.
 """
 
 from pathlib import Path
-from datetime import datetime
+from functools import lru_cache
 from typing import Optional
+import os
 import re
+import time
+
+# Session names that are already directory-safe skip sanitizing entirely
+_SAFE_NAME = re.compile(r'\A[\w-]+\Z')
+
+# Characters stripped from session names when building directory names
+_UNSAFE = re.compile(r'[^\w\s-]')
+
+
+@lru_cache(maxsize=1)
+def _date_stamp(year: int, month: int, day: int) -> str:
+    """Format a local date as YYYYMMDD (cached for the current day)."""
+    return f"{year:04d}{month:02d}{day:02d}"
+
+
+def _ensure_dir(path: str) -> None:
+    """
+    Create a directory, trying a single mkdir before walking parents.
+
+    The common case (parent exists) costs one syscall; the makedirs
+    fallback only runs when an ancestor is missing.
+    """
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        # Only an existing directory is fine; a file in the way must surface here
+        if not os.path.isdir(path):
+            raise
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
 
 
 class OutputManager:
@@ -23,6 +54,12 @@ class OutputManager:
         # Returns: outputs/portrait_study_20251018/image_001.png
     """
 
+    __slots__ = (
+        "base_dir", "session_name", "add_timestamp", "create_subdirs",
+        "session_dir", "images_dir", "data_dir",
+        "_images_prefix", "_data_prefix", "_session_prefix",
+    )
+
     def __init__(
         self,
         base_dir: str = "outputs",
@@ -40,32 +77,25 @@ class OutputManager:
             create_subdirs: Auto-create subdirectories like "images", "data" (default: True)
         """
         # Normalize and validate base_dir to prevent nested outputs directories
-        base_path = Path(base_dir)
-
-        # Prevent common mistake of nested "outputs/outputs" directories
-        # Normalize the path by removing any redundant "outputs" components
-        parts = base_path.parts
-        if parts.count("outputs") > 1:
-            # Remove duplicate "outputs" from path
-            cleaned_parts = []
-            seen_outputs = False
-            for part in parts:
-                if part == "outputs":
-                    if not seen_outputs:
-                        cleaned_parts.append(part)
-                        seen_outputs = True
-                    # Skip duplicate "outputs"
-                else:
-                    cleaned_parts.append(part)
-            base_path = Path(*cleaned_parts) if cleaned_parts else Path("outputs")
+        # (paths are kept as plain strings internally; Path only at the API edge)
+        base_path = os.path.normpath(str(base_dir))
+
+        # Prevent common mistake of nested "outputs/outputs" directories by
+        # collapsing repeated components with plain string scans (padding with
+        # separators keeps matches on whole components, e.g. not "my_outputs")
+        nested = f"{os.sep}outputs{os.sep}outputs{os.sep}"
+        padded = f"{os.sep}{base_path}{os.sep}"
+        while nested in padded:
+            padded = padded.replace(nested, f"{os.sep}outputs{os.sep}")
+        base_path = padded[1:-1]
 
         # If base_dir ends with "outputs", use it directly; otherwise default to "outputs"
-        if base_path.name != "outputs" and str(base_path) != "outputs":
+        if os.path.basename(base_path) != "outputs" and base_path != "outputs":
             # User specified a non-standard base dir, use it as-is
             self.base_dir = base_path
         else:
             # Standard case: use "outputs" as base
-            self.base_dir = Path("outputs")
+            self.base_dir = "outputs"
 
         self.session_name = session_name or "generation"
         self.add_timestamp = add_timestamp
@@ -75,28 +105,59 @@ class OutputManager:
         self.session_dir = self._create_session_dir()
 
         # Create standard subdirectories
-        self.images_dir = self.session_dir / "images" if create_subdirs else self.session_dir
-        self.data_dir = self.session_dir / "data" if create_subdirs else self.session_dir
+        self.images_dir = os.path.join(self.session_dir, "images") if create_subdirs else self.session_dir
+        self.data_dir = os.path.join(self.session_dir, "data") if create_subdirs else self.session_dir
+
+        # Creating the leaves also creates session_dir; without subdirs all
+        # three are the same directory, so it is only made once
+        if create_subdirs:
+            _ensure_dir(self.images_dir)
+            _ensure_dir(self.data_dir)
+        else:
+            _ensure_dir(self.session_dir)
 
-        for dir_path in [self.images_dir, self.data_dir]:
-            dir_path.mkdir(parents=True, exist_ok=True)
+        # Cached string prefixes for cheap per-file path building
+        self._images_prefix = self.images_dir + os.sep
+        self._data_prefix = self.data_dir + os.sep
+        self._session_prefix = self.session_dir + os.sep
 
-    def _create_session_dir(self) -> Path:
-        """Create and return the session directory."""
+    def _create_session_dir(self) -> str:
+        """Build and return the session directory path (created by __init__)."""
         # Sanitize session name
-        safe_name = re.sub(r'[^\w\s-]', '', self.session_name).strip().replace(' ', '_')
+        safe_name = self.session_name
+        if not _SAFE_NAME.match(safe_name):
+            safe_name = _UNSAFE.sub('', safe_name).strip().replace(' ', '_')
 
         # Add timestamp if requested
         if self.add_timestamp:
-            timestamp = datetime.now().strftime("%Y%m%d")
+            now = time.localtime()
+            timestamp = _date_stamp(now.tm_year, now.tm_mon, now.tm_mday)
             dir_name = f"{safe_name}_{timestamp}"
         else:
             dir_name = safe_name
 
-        session_path = self.base_dir / dir_name
-        session_path.mkdir(parents=True, exist_ok=True)
+        return os.path.join(self.base_dir, dir_name)
+
+    def get_output_path_str(self, filename: str, subdir: str = "images") -> str:
+        """
+        Get full output path for a file as a plain string.
+
+        Cheaper than get_output_path() for tight loops since no Path
+        object is built.
 
-        return session_path
+        Args:
+            filename: Name of the file
+            subdir: Subdirectory ("images" or "data")
+
+        Returns:
+            Full path to the output file as string
+        """
+        if subdir == "images":
+            return self._images_prefix + filename
+        elif subdir == "data":
+            return self._data_prefix + filename
+        else:
+            return self._session_prefix + filename
 
     def get_output_path(self, filename: str, subdir: str = "images") -> Path:
         """
@@ -109,17 +170,15 @@ class OutputManager:
         Returns:
             Full path to the output file
         """
-        if subdir == "images":
-            return self.images_dir / filename
-        elif subdir == "data":
-            return self.data_dir / filename
-        else:
-            return self.session_dir / filename
+        return Path(self.get_output_path_str(filename, subdir))
 
     def get_relative_path(self, filename: str, subdir: str = "images") -> str:
         """
         Get relative path from current directory.
 
+        Intended for logging/display; use get_output_path() when a Path is
+        needed for filesystem operations.
+
         Args:
             filename: Name of the file
             subdir: Subdirectory ("images" or "data")
@@ -127,11 +186,15 @@ class OutputManager:
         Returns:
             Relative path as string
         """
-        return str(self.get_output_path(filename, subdir))
+        if subdir == "images":
+            return self._images_prefix + filename
+        if subdir == "data":
+            return self._data_prefix + filename
+        return self._session_prefix + filename
 
     def __str__(self) -> str:
         """String representation showing the session directory."""
-        return str(self.session_dir)
+        return self.session_dir
 
     def __repr__(self) -> str:
         """Detailed representation."""
@@ -5,19 +5,22 @@ Provides intelligent thermal throttling detection and prevention
 for long-running image generation tasks.
 """
 
+import sys
 import time
-import statistics
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Iterator, Tuple
 from dataclasses import dataclass
 from collections import deque
+from contextlib import contextmanager
 
+import numpy as np
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class ThermalState:
-    """Current thermal state of the system."""
+    """Current thermal state of the system (immutable snapshot)."""
     is_throttled: bool
     performance_ratio: float  # 1.0 = normal, < 1.0 = throttled
-    recent_times: List[float]
+    recent_times: Tuple[float, ...]
     baseline_time: float
 
 
@@ -38,13 +41,22 @@ class ThermalManager:
                 thermal_mgr.cooling_break()
 
             # Generate image and record timing
-            start = time.time()
-            generate_image()
-            elapsed = time.time() - start
+            with thermal_mgr.time_block():
+                generate_image()
 
-            thermal_mgr.record_timing(elapsed)
+        # Equivalent manual timing (use a monotonic clock, not time.time())
+        start = time.monotonic()
+        generate_image()
+        thermal_mgr.record_timing(time.monotonic() - start)
     """
 
+    __slots__ = (
+        "baseline", "throttle_threshold", "slope_threshold", "critical_threshold",
+        "cooling_duration", "all_timings", "cooling_breaks_taken", "total_cooling_time",
+        "_win", "_win_i", "_win_n", "_window_sum",
+        "_total_count", "_total_sum", "_total_min", "_total_max", "_active",
+    )
+
     def __init__(
         self,
         baseline_time_per_step: Optional[float] = None,
@@ -52,6 +64,8 @@ class ThermalManager:
         critical_threshold: float = 3.0,
         window_size: int = 5,
         cooling_duration: int = 30,
+        max_history: int = 1000,
+        slope_threshold: float = 0.05,
     ):
         """
         Initialize thermal manager.
@@ -63,39 +77,104 @@ class ThermalManager:
             critical_threshold: Slowdown factor indicating critical throttling
             window_size: Number of recent timings to track
             cooling_duration: How long to pause during cooling breaks (seconds)
+            max_history: Number of timings kept in all_timings (oldest dropped first)
+            slope_threshold: Per-sample rise in timing, as a fraction of baseline,
+                             that counts as a throttling trend (0.05 = 5%/sample)
         """
         self.baseline = baseline_time_per_step
         self.throttle_threshold = throttle_threshold
+        self.slope_threshold = slope_threshold
         self.critical_threshold = critical_threshold
         self.cooling_duration = cooling_duration
 
-        self.timings = deque(maxlen=window_size)
-        self.all_timings: List[float] = []
+        # Recent-timing window as a fixed ring buffer: _win_i is the next
+        # write slot, _win_n the number of valid samples
+        self._win = np.zeros(window_size, dtype=np.float64)
+        self._win_i = 0
+        self._win_n = 0
+        self._window_sum = 0.0
+
+        self.all_timings = deque(maxlen=max_history)
+
+        # Lifetime aggregates so get_stats() is O(1) and unaffected by the
+        # all_timings history cap
+        self._total_count = 0
+        self._total_sum = 0.0
+        self._total_min = float("inf")
+        self._total_max = float("-inf")
         self.cooling_breaks_taken = 0
         self.total_cooling_time = 0.0
 
+        # Set once a baseline exists and the window has a sample; the thermal
+        # checks are a single attribute read until then
+        self._active = False
+
     def record_timing(self, elapsed_time: float) -> None:
         """Record timing from a generation step."""
-        self.timings.append(elapsed_time)
+        # Overwrite the oldest slot once the ring is full
+        if self._win_n == len(self._win):
+            self._window_sum -= self._win[self._win_i]
+        else:
+            self._win_n += 1
+
+        self._win[self._win_i] = elapsed_time
+        self._win_i = (self._win_i + 1) % len(self._win)
+        self._window_sum += elapsed_time
         self.all_timings.append(elapsed_time)
+        self._total_count += 1
+        self._total_sum += elapsed_time
+        if elapsed_time < self._total_min:
+            self._total_min = elapsed_time
+        if elapsed_time > self._total_max:
+            self._total_max = elapsed_time
 
         # Auto-learn baseline from first few samples if not provided
-        if self.baseline is None and len(self.all_timings) >= 3:
-            self.baseline = statistics.median(list(self.timings))
+        if self.baseline is None and self._total_count >= 3:
+            self.baseline = float(np.median(self._win[:self._win_n]))
+
+        if self.baseline is not None:
+            self._active = True
+
+    @property
+    def timings(self) -> List[float]:
+        """Recent timings in the window, oldest first."""
+        return self._window_view().tolist()
+
+    def _window_view(self) -> np.ndarray:
+        """Window samples in chronological order (a view until the ring wraps)."""
+        if self._win_n < len(self._win):
+            return self._win[:self._win_n]
+        return np.concatenate((self._win[self._win_i:], self._win[:self._win_i]))
+
+    @contextmanager
+    def time_block(self) -> Iterator[None]:
+        """
+        Time the enclosed block with a monotonic clock and record it.
+
+        Wall-clock jumps (NTP, DST) cannot produce bogus timings. Nothing
+        is recorded if the block raises.
+
+        Example:
+            with thermal_mgr.time_block():
+                gen.generate(prompt)
+        """
+        start = time.monotonic()
+        yield
+        self.record_timing(time.monotonic() - start)
 
     def get_thermal_state(self) -> Optional[ThermalState]:
         """Get current thermal state."""
-        if not self.timings or self.baseline is None:
+        if not self._active:
             return None
 
-        recent_avg = statistics.mean(self.timings)
+        recent_avg = self._window_sum / self._win_n
         performance_ratio = self.baseline / recent_avg
         is_throttled = performance_ratio < (1.0 / self.throttle_threshold)
 
         return ThermalState(
             is_throttled=is_throttled,
             performance_ratio=performance_ratio,
-            recent_times=list(self.timings),
+            recent_times=tuple(self.timings),
             baseline_time=self.baseline,
         )
 
@@ -104,15 +183,41 @@ class ThermalManager:
         Check if we should take a cooling break.
 
         Returns True if performance has degraded significantly,
-        indicating thermal throttling is occurring.
+        indicating thermal throttling is occurring: either the recent window
+        averages above the throttle threshold, or the latest timings are over
+        it and still trending upward. A single slow outlier does not trigger
+        a break.
         """
-        state = self.get_thermal_state()
-        if state is None:
+        if not self._active:
             return False
+        return self._check_throttled_fast()
 
-        # If recent performance is significantly worse than baseline, cool down
-        slowdown_factor = max(state.recent_times) / state.baseline_time
-        return slowdown_factor >= self.throttle_threshold
+    def _check_throttled_fast(self) -> bool:
+        """
+        Hot-path throttle check without building a ThermalState.
+
+        Works straight off the ring buffer and running sum, so no dataclass
+        or list copy is allocated per generation step. Callers must check
+        self._active first.
+        """
+        threshold = self.throttle_threshold * self.baseline
+
+        # Sustained slowdown: the whole window averages above threshold
+        if self._window_sum / self._win_n >= threshold:
+            return True
+
+        # Rising trend: the last two samples are slow and the least-squares
+        # slope over the window is climbing (GPU throttling ramps up gradually,
+        # whereas a lone spike fails the two-sample check)
+        if self._win_n < 3:
+            return False
+        recent = self._window_view()
+        if recent[-1] < threshold or recent[-2] < threshold:
+            return False
+
+        x = np.arange(self._win_n) - (self._win_n - 1) / 2
+        slope = float(x @ recent) / float(x @ x)
+        return slope / self.baseline >= self.slope_threshold
 
     def cooling_break(self, duration: Optional[int] = None) -> None:
         """
@@ -123,31 +228,64 @@ class ThermalManager:
         """
         pause_time = duration if duration is not None else self.cooling_duration
 
-        print(f"  🌡️  Thermal throttling detected - taking {pause_time}s cooling break...")
+        # Emoji only on a terminal; redirected logs get plain ASCII
+        if sys.stdout.isatty():
+            start_mark, done_mark = "🌡️ ", "✓"
+        else:
+            start_mark, done_mark = "[thermal]", "[ok]"
+
+        # Single write each, flushed so the notice shows before the pause
+        # even when stdout is a block-buffered pipe
+        sys.stdout.write(
+            f"  {start_mark} Thermal throttling detected - taking {pause_time}s cooling break...\n"
+        )
+        sys.stdout.flush()
         time.sleep(pause_time)
 
         self.cooling_breaks_taken += 1
         self.total_cooling_time += pause_time
 
-        print(f"  ✓ Cooling complete (break #{self.cooling_breaks_taken})")
+        # Hysteresis reset to prevent oscillation: the slow samples that
+        # triggered this break must not immediately trigger another one
+        self._reset_window()
+
+        sys.stdout.write(f"  {done_mark} Cooling complete (break #{self.cooling_breaks_taken})\n")
+        sys.stdout.flush()
+
+    def _reset_window(self) -> None:
+        """
+        Clear the recent-timing window, seeding it with the baseline.
+
+        The seed keeps the window non-empty (so the active checks stay valid)
+        and means several genuinely slow samples are needed before the next
+        cooling break fires.
+        """
+        self._win_i = 0
+        self._win_n = 0
+        self._window_sum = 0.0
+        if self.baseline is not None:
+            self._win[0] = self.baseline
+            self._win_i = 1 % len(self._win)
+            self._win_n = 1
+            self._window_sum = self.baseline
 
     def get_stats(self) -> Dict:
         """Get thermal management statistics."""
-        if not self.all_timings:
+        if not self._total_count:
             return {}
 
         state = self.get_thermal_state()
 
         return {
-            "total_generations": len(self.all_timings),
+            "total_generations": self._total_count,
             "cooling_breaks_taken": self.cooling_breaks_taken,
             "total_cooling_time_seconds": self.total_cooling_time,
             "baseline_time_per_step": self.baseline,
             "current_performance_ratio": state.performance_ratio if state else None,
             "is_currently_throttled": state.is_throttled if state else False,
-            "avg_time_per_step": statistics.mean(self.all_timings),
-            "min_time_per_step": min(self.all_timings),
-            "max_time_per_step": max(self.all_timings),
+            "avg_time_per_step": self._total_sum / self._total_count,
+            "min_time_per_step": self._total_min,
+            "max_time_per_step": self._total_max,
         }
 
     def print_stats(self) -> None:
@@ -182,6 +320,8 @@ class BatchThermalManager(ThermalManager):
     to maintain optimal thermal performance.
     """
 
+    __slots__ = ("batch_size", "batch_cooling_duration", "current_batch_count")
+
     def __init__(
         self,
         batch_size: int = 10,
@@ -212,8 +352,8 @@ class BatchThermalManager(ThermalManager):
         if self.current_batch_count >= self.batch_size:
             return True
 
-        # Or if throttling detected
-        return super().should_cool()
+        # Or if throttling detected (fast path, no parent re-entry)
+        return self._active and self._check_throttled_fast()
 
     def cooling_break(self, duration: Optional[int] = None) -> None:
         """Take cooling break and reset batch counter."""
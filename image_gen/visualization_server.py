@@ -5,2531 +5,535 @@ This server provides a web interface that shows exactly what's happening
 during image generation, with live updates and component highlighting.
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, Dict, List, Set
 from pathlib import Path
 import asyncio
+import base64
+import binascii
+import io
 import logging
+import os
+import stat
 import time
 import json
-from datetime import datetime
+import gzip
+import hashlib
+import importlib.util
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from datetime import datetime, timezone
+
+import orjson
+from PIL import Image, UnidentifiedImageError
+
+try:
+    import msgpack
+except ImportError:  # Optional: clients fall back to JSON frames
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # Optional: the UI page is served gzip-only
+    brotli = None
 
 from image_gen.core import ImageGenerator
 from image_gen.config import get_config
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="ImageGeneratorLLM Visualization")
+app = FastAPI(title="ImageGeneratorLLM Visualization", default_response_class=ORJSONResponse)
 
-# Global state
-_generator: Optional[ImageGenerator] = None
-_active_connections: List[WebSocket] = []
-_current_state: Dict[str, Any] = {
-    "component": "idle",
-    "progress": 0,
-    "total_steps": 0,
-    "message": "Ready",
-    "metrics": {}
-}
+# orjson options for WebSocket state frames
+_ORJSON_OPTS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
 
+# WebSocket frame encoders, keyed by negotiated subprotocol ("json" = default)
+_ENCODERS = {"json": lambda message: orjson.dumps(message, option=_ORJSON_OPTS)}
+if msgpack is not None:
+    _ENCODERS["msgpack"] = msgpack.packb
 
-class TimingTracker:
-    """Track component execution times for visualization."""
 
-    def __init__(self):
-        self.component_times = {}
-        self.component_start_times = {}
+def _batch_json(payloads: List[bytes]) -> bytes:
+    """Wrap already-encoded JSON messages in one {"type": "batch", "items": [...]} frame."""
+    return b'{"type":"batch","items":[' + b",".join(payloads) + b"]}"
 
-    def start_component(self, component_name: str):
-        """Mark the start of a component's execution."""
-        self.component_start_times[component_name] = time.time()
 
-    def end_component(self, component_name: str) -> float:
-        """Mark the end of a component and return elapsed time."""
-        if component_name not in self.component_start_times:
-            return 0.0
+def _batch_msgpack(payloads: List[bytes]) -> bytes:
+    """MessagePack equivalent of _batch_json, splicing the encoded items verbatim."""
+    packer = msgpack.Packer()
+    return (
+        packer.pack_map_header(2)
+        + packer.pack("type") + packer.pack("batch")
+        + packer.pack("items") + packer.pack_array_header(len(payloads))
+        + b"".join(payloads)
+    )
 
-        elapsed = time.time() - self.component_start_times[component_name]
-        self.component_times[component_name] = elapsed
-        return elapsed
 
-    def get_percentages(self) -> dict:
-        """Calculate percentage of total time for each component."""
-        total_time = sum(self.component_times.values())
-        if total_time == 0:
-            return {}
+# Combine several queued frames of one format into a single batch frame
+_BATCHERS = {"json": _batch_json, "msgpack": _batch_msgpack}
 
-        return {
-            component: (elapsed / total_time) * 100
-            for component, elapsed in self.component_times.items()
-        }
+# Web UI assets (index.html with inline CSS, app.js with the UI logic)
+STATIC_DIR = Path(__file__).parent / "static"
 
-    def reset(self):
-        """Reset all timing data."""
-        self.component_times.clear()
-        self.component_start_times.clear()
 
+class PrecompressedAsset:
+    """A static asset read, compressed and hashed once at import."""
 
-timing_tracker = TimingTracker()
+    __slots__ = ("body", "gzip", "brotli", "etag", "media_type")
 
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.gzip = gzip.compress(body, compresslevel=9)
+        self.brotli: Optional[bytes] = brotli.compress(body, quality=11) if brotli else None
+        self.etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        self.media_type = media_type
 
-class ConnectionManager:
-    """Manage WebSocket connections for real-time updates."""
+    def response(self, request: Request, cache_control: str) -> Response:
+        """Answer a GET with a 304, or the best encoding the client accepts."""
+        headers = {"ETag": self.etag, "Vary": "Accept-Encoding", "Cache-Control": cache_control}
 
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"Client connected. Total: {len(self.active_connections)}")
-
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-        logger.info(f"Client disconnected. Total: {len(self.active_connections)}")
+        if self.etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
 
-    async def broadcast(self, message: dict):
-        """Send message to all connected clients."""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending to client: {e}")
-                disconnected.append(connection)
-
-        # Clean up disconnected clients
-        for conn in disconnected:
-            if conn in self.active_connections:
-                self.active_connections.remove(conn)
-
-
-manager = ConnectionManager()
-
-
-async def emit_state(component: str, progress: int = 0, total: int = 0, message: str = "", metrics: dict = None, api_call: str = None, component_timing: dict = None, component_percentages: dict = None):
-    """Emit current state to all connected clients."""
-    state = {
-        "component": component,
-        "progress": progress,
-        "total": total,
-        "message": message,
-        "timestamp": datetime.now().isoformat(),
-        "metrics": metrics or {}
-    }
-    if api_call:
-        state["api_call"] = api_call
-    if component_timing:
-        state["component_timing"] = component_timing
-    if component_percentages:
-        state["component_percentages"] = component_percentages
-    await manager.broadcast(state)
-
-
-class GenerateRequest(BaseModel):
-    prompt: str
-    mode: Optional[str] = "text2img"  # text2img, img2img, controlnet
-    num_inference_steps: Optional[int] = 30
-    guidance_scale: Optional[float] = 7.5
-    width: Optional[int] = 1024
-    height: Optional[int] = 1024
-    seed: Optional[int] = None
-    init_image: Optional[str] = None  # Base64 encoded image for img2img/controlnet
-    strength: Optional[float] = 0.8  # For img2img: how much to transform (0-1)
-
-
-@app.get("/", response_class=HTMLResponse)
-async def get_interface():
-    """Serve the visualization interface."""
-    html_content = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Image Generation Pipeline Visualizer</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-            background: #0a0e27;
-            color: #e0e0e0;
-            padding: 10px;
-            font-size: 14px;
-        }
-        .container { max-width: 1600px; margin: 0 auto; }
-        h1 {
-            text-align: center;
-            margin-bottom: 12px;
-            color: #4fc3f7;
-            font-size: 1.4em;
-            font-weight: 600;
-        }
-        .grid {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 12px;
-            margin-bottom: 12px;
-        }
-
-        /* Grid for Model Insights on left 1/3 */
-        .insights-layout-grid {
-            display: grid;
-            grid-template-columns: 1fr 2fr;
-            gap: 15px;
-            margin-bottom: 15px;
-            align-items: start;
-        }
-        .grid.control-flow {
-            grid-template-columns: 1fr 2fr;
-        }
-        .panel {
-            background: #1a1f3a;
-            border-radius: 8px;
-            padding: 12px;
-            border: 1px solid #2a3f5f;
-        }
-        .panel h2 {
-            color: #4fc3f7;
-            margin-bottom: 10px;
-            font-size: 1.05em;
-            font-weight: 600;
+        accepted = {
+            token.split(";", 1)[0].strip()
+            for token in request.headers.get("accept-encoding", "").split(",")
         }
+        if self.brotli is not None and "br" in accepted:
+            headers["Content-Encoding"] = "br"
+            return Response(content=self.brotli, media_type=self.media_type, headers=headers)
+        if "gzip" in accepted:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip, media_type=self.media_type, headers=headers)
 
-        /* Flowchart - Horizontal Layout */
-        .pipeline {
-            position: relative;
-            padding: 18px 15px;
-            min-height: 240px;
-        }
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
 
-        /* Comprehensive Multi-Path Pipeline */
-        .pipeline-comprehensive {
-            position: relative;
-            padding: 12px;
-        }
 
-        .pipeline-stage {
-            margin-bottom: 20px;
-            padding: 16px;
-            background: linear-gradient(135deg, rgba(26, 31, 58, 0.6) 0%, rgba(20, 24, 48, 0.4) 100%);
-            border-radius: 10px;
-            border: 2px solid #2a3f5f;
-            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.3), inset 0 1px 0 rgba(79, 195, 247, 0.1);
-            position: relative;
-        }
+# The UI is encoded once at import so serving it costs no file I/O per
+# request (restart to pick up edits). The page references app.js with its
+# content hash, so the script can be cached forever and still update when
+# it changes.
+_APP_JS = PrecompressedAsset((STATIC_DIR / "app.js").read_bytes(), "text/javascript")
+_INTERFACE = PrecompressedAsset(
+    (STATIC_DIR / "index.html").read_bytes().replace(
+        b"__APP_JS_VERSION__", _APP_JS.etag.strip('"').encode()
+    ),
+    "text/html",
+)
 
-        .pipeline-stage::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 3px;
-            background: linear-gradient(90deg, transparent, #4fc3f7 20%, #4fc3f7 80%, transparent);
-            border-radius: 10px 10px 0 0;
-        }
+# Global state
+_generator: Optional[ImageGenerator] = None
 
-        .stage-header {
-            font-size: 0.75em;
-            font-weight: 700;
-            color: #4fc3f7;
-            text-transform: uppercase;
-            letter-spacing: 2px;
-            margin-bottom: 12px;
-            padding-bottom: 8px;
-            border-bottom: 1px solid rgba(79, 195, 247, 0.2);
-            text-align: center;
-        }
+# Fixed scaffolding of the "API call" panel text; /generate only fills in
+# the per-request values
+_API_CALL_TEMPLATE = """📋 GENERATION PARAMETERS:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-        .path-label {
-            position: absolute;
-            top: -8px;
-            right: 6px;
-            font-size: 0.6em;
-            color: #8b949e;
-            background: #1a1f3a;
-            padding: 2px 6px;
-            border-radius: 3px;
-            font-weight: 600;
-            border: 1px solid #2a3f5f;
-        }
+🔹 MODE:
+   • %(mode_desc)s%(mode_note)s
 
-        /* Stage Flow Connectors */
-        .stage-connector {
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            margin: 15px 0;
-            position: relative;
-            height: 50px;
-        }
+🔹 PROMPT (Positive):
+   "%(prompt)s"
 
-        .stage-connector::before {
-            content: '';
-            width: 4px;
-            height: 100%;
-            background: linear-gradient(180deg, #2a3f5f 0%, #4fc3f7 50%, #2a3f5f 100%);
-            position: absolute;
-            left: 50%;
-            transform: translateX(-50%);
-        }
+🔹 NEGATIVE PROMPT:
+   "%(negative_prompt)s"
 
-        .stage-connector::after {
-            content: '▼';
-            position: absolute;
-            bottom: -5px;
-            left: 50%;
-            transform: translateX(-50%);
-            color: #4fc3f7;
-            font-size: 1.2em;
-            text-shadow: 0 0 10px rgba(79, 195, 247, 0.5);
-        }
+🔹 MODEL CONFIGURATION:
+   • Model ID: %(model_id)s
+   • Variant: fp16 (half precision)
+   • Device: %(device)s
+   • Model Type: Stable Diffusion XL
 
-        .stage-connector-label {
-            background: linear-gradient(135deg, #1a1f3a 0%, #0d1117 100%);
-            padding: 6px 16px;
-            border-radius: 6px;
-            font-size: 0.7em;
-            color: #4fc3f7;
-            border: 2px solid #2a3f5f;
-            position: relative;
-            z-index: 1;
-            font-weight: 600;
-            letter-spacing: 0.5px;
-            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.4);
-        }
+🔹 GENERATION PARAMETERS:
+   • Width: %(width)s px
+   • Height: %(height)s px
+   • Inference Steps: %(steps)s
+   • Guidance Scale: %(guidance_scale)s (how strongly to follow prompt)
+   • Seed: %(seed)s
+   • Scheduler: %(scheduler)s
 
-        .stage-connector-arrow {
-            display: none;
-        }
+🔹 INTERNAL PROCESSING:
+   • Latent Size: [%(latent_height)s x %(latent_width)s] (VAE compresses 8x)
+   • Latent Channels: 4 (SDXL latent space dimensionality)
+   • Text Encoder: CLIP (2 encoders for SDXL)
+   • Cross-Attention: Text embeddings guide image latents
+   • Self-Attention: Ensures spatial coherency in image
+   • Total UNet Parameters: ~2.6 billion
 
-        /* Pipeline Row - for horizontal stage layout */
-        .pipeline-row-wrapper {
-            display: grid;
-            grid-template-columns: 1fr auto 1fr;
-            gap: 0;
-            align-items: stretch;
-            margin-bottom: 20px;
-        }
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"""
 
-        .pipeline-row-wrapper .pipeline-stage {
-            margin-bottom: 0;
-        }
+# Generation is serial on the device anyway; giving it its own single worker
+# keeps the default executor free for file I/O while a diffusion run is going
+_GEN_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="diffusion")
 
-        /* Horizontal Stage Connector */
-        .horizontal-stage-connector {
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            padding: 0 20px;
-            position: relative;
-            min-width: 80px;
-        }
 
-        .horizontal-stage-connector::before {
-            content: '';
-            height: 4px;
-            width: 100%;
-            background: linear-gradient(90deg, #2a3f5f 0%, #4fc3f7 50%, #2a3f5f 100%);
-            position: absolute;
-            top: 50%;
-            transform: translateY(-50%);
-        }
+class TimingTracker:
+    """Track component execution times for visualization."""
 
-        .horizontal-stage-connector::after {
-            content: '▶';
-            position: absolute;
-            right: 10px;
-            top: 50%;
-            transform: translateY(-50%);
-            color: #4fc3f7;
-            font-size: 1.2em;
-            text-shadow: 0 0 10px rgba(79, 195, 247, 0.5);
-        }
+    __slots__ = ("component_times", "component_start_times", "_percentages_cache")
 
-        .horizontal-connector-label {
-            background: linear-gradient(135deg, #1a1f3a 0%, #0d1117 100%);
-            padding: 6px 12px;
-            border-radius: 6px;
-            font-size: 0.65em;
-            color: #4fc3f7;
-            border: 2px solid #2a3f5f;
-            position: relative;
-            z-index: 1;
-            font-weight: 600;
-            letter-spacing: 0.5px;
-            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.4);
-            white-space: nowrap;
-        }
+    def __init__(self):
+        self.component_times = {}
+        self.component_start_times = {}
+        self._percentages_cache: Optional[dict] = None
 
-        .vertical-connector-label {
-            position: absolute;
-            left: 50%;
-            top: 50%;
-            transform: translate(-50%, -50%);
-            background: linear-gradient(135deg, #1a1f3a 0%, #0d1117 100%);
-            padding: 6px 16px;
-            border-radius: 6px;
-            font-size: 0.7em;
-            color: #4fc3f7;
-            border: 2px solid #2a3f5f;
-            font-weight: 600;
-            letter-spacing: 0.5px;
-            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.4);
-            white-space: nowrap;
-            z-index: 10;
-        }
+    def start_component(self, component_name: str):
+        """Mark the start of a component's execution."""
+        self.component_start_times[component_name] = time.perf_counter()
 
-        /* Internal Sequential Flow Arrow */
-        .seq-arrow {
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            margin: 4px 0;
-            position: relative;
-            height: 30px;
-        }
+    def end_component(self, component_name: str) -> float:
+        """Mark the end of a component and return elapsed time."""
+        if component_name not in self.component_start_times:
+            return 0.0
 
-        .seq-arrow::before {
-            content: '';
-            width: 2px;
-            height: 50%;
-            background: linear-gradient(180deg, #2a3f5f 0%, #4fc3f7 100%);
-            position: absolute;
-            top: 0;
-            left: 50%;
-            transform: translateX(-50%);
-        }
+        elapsed = time.perf_counter() - self.component_start_times[component_name]
+        self.component_times[component_name] = elapsed
+        self._percentages_cache = None
+        return elapsed
 
-        .seq-arrow::after {
-            content: '▼';
-            color: #4fc3f7;
-            font-size: 0.9em;
-            line-height: 0.5;
-            text-shadow: 0 0 8px rgba(79, 195, 247, 0.6);
-            position: absolute;
-            bottom: 2px;
-            animation: pulse-arrow 2s ease-in-out infinite;
-        }
+    def get_percentages(self) -> dict:
+        """Calculate percentage of total time for each component (cached until times change)."""
+        if self._percentages_cache is not None:
+            return self._percentages_cache
 
-        @keyframes pulse-arrow {
-            0%, 100% {
-                opacity: 0.8;
-                transform: translateY(0);
-            }
-            50% {
-                opacity: 1;
-                transform: translateY(2px);
+        total_time = sum(self.component_times.values())
+        if total_time == 0:
+            self._percentages_cache = {}
+        else:
+            self._percentages_cache = {
+                component: (elapsed / total_time) * 100
+                for component, elapsed in self.component_times.items()
             }
-        }
+        return self._percentages_cache
 
-        .flowchart-row {
-            display: flex;
-            justify-content: flex-start;
-            align-items: center;
-            margin: 10px 0;
-            position: relative;
-            gap: 8px;
-            flex-wrap: nowrap;
-        }
-
-        /* Multi-column grid for condensed stages */
-        .stage-grid {
-            display: grid;
-            grid-template-columns: repeat(3, 1fr);
-            gap: 10px 15px;
-            margin: 10px 0;
-        }
-
-        .stage-grid-column {
-            display: flex;
-            flex-direction: column;
-            gap: 8px;
-            align-items: center;
-        }
-
-        .stage-grid-column-header {
-            font-size: 0.7em;
-            color: #8b949e;
-            font-weight: 600;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-            margin-bottom: 4px;
-        }
-
-        .component {
-            background: linear-gradient(145deg, #1e2d3d 0%, #1a2532 100%);
-            border: 2px solid #2a3f5f;
-            border-radius: 6px;
-            padding: 9px 14px;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            position: relative;
-            width: fit-content;
-            text-align: center;
-            box-shadow: 0 2px 6px rgba(0,0,0,0.4), inset 0 1px 0 rgba(255,255,255,0.05);
-        }
-
-        .component::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: linear-gradient(135deg, rgba(79, 195, 247, 0.1) 0%, transparent 100%);
-            border-radius: 8px;
-            opacity: 0;
-            transition: opacity 0.3s ease;
-        }
-
-        .component:hover::before {
-            opacity: 1;
-        }
-
-        .component.active {
-            border-color: #4fc3f7;
-            background: linear-gradient(145deg, #2a4f6f 0%, #1e3a52 100%);
-            box-shadow: 0 0 20px rgba(79, 195, 247, 0.15), 0 5px 15px rgba(0,0,0,0.5);
-            transform: translateY(-3px) scale(1.02);
-        }
-
-        .component.active::after {
-            content: '';
-            position: absolute;
-            top: -3px;
-            left: -3px;
-            right: -3px;
-            bottom: -3px;
-            background: linear-gradient(135deg, #4fc3f7, #66bb6a);
-            border-radius: 10px;
-            z-index: -1;
-            opacity: 0.1;
-        }
-
-        .component.completed {
-            border-color: #66bb6a;
-            background: linear-gradient(145deg, #2a4736 0%, #1e3329 100%);
-            box-shadow: 0 2px 8px rgba(102, 187, 106, 0.3);
-        }
-
-        .component.inactive {
-            opacity: 0.75;
-            filter: grayscale(40%);
-            border-color: #1a2532;
-            background: linear-gradient(145deg, #151a23 0%, #0f1419 100%);
-        }
-
-        .component.inactive .tooltip {
-            /* Keep tooltips visible for educational purposes */
-            display: block;
-        }
-
-        .component-name {
-            font-weight: 600;
-            font-size: 0.75em;
-            margin-bottom: 3px;
-            color: #4fc3f7;
-            text-transform: uppercase;
-            letter-spacing: 0.2px;
-        }
-
-        .component.active .component-name {
-            color: #66bb6a;
-        }
-
-        .component-desc {
-            font-size: 0.65em;
-            color: #8b949e;
-            line-height: 1.15;
-        }
-
-        /* Component timing and percentage */
-        .component-timing {
-            font-size: 0.6em;
-            color: #66bb6a;
-            margin-top: 4px;
-            font-weight: 500;
-            display: none; /* Hidden by default, shown when timing data available */
-        }
-
-        .component.active .component-timing,
-        .component.completed .component-timing {
-            display: block;
-        }
-
-        .component-percentage {
-            font-size: 0.55em;
-            color: #ffa726;
-            margin-top: 2px;
-            font-weight: 600;
-            display: none; /* Only shown after generation completes */
-        }
-
-        .component.completed .component-percentage.visible {
-            display: block;
-        }
-
-        /* Tooltips */
-        .component {
-            position: relative;
-        }
-
-        .component .tooltip {
-            visibility: hidden;
-            opacity: 0;
-            position: absolute;
-            z-index: 1000;
-            background: #1a1f3a;
-            color: #e0e0e0;
-            padding: 12px 15px;
-            border-radius: 6px;
-            border: 1px solid #4fc3f7;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.5);
-            width: 280px;
-            bottom: 100%;
-            left: 50%;
-            transform: translateX(-50%) translateY(-10px);
-            margin-bottom: 10px;
-            transition: opacity 0.3s, transform 0.3s;
-            pointer-events: none;
-        }
-
-        .component .tooltip::after {
-            content: '';
-            position: absolute;
-            top: 100%;
-            left: 50%;
-            transform: translateX(-50%);
-            border: 8px solid transparent;
-            border-top-color: #4fc3f7;
-        }
-
-        .component:hover .tooltip {
-            visibility: visible;
-            opacity: 1;
-            transform: translateX(-50%) translateY(0);
-        }
-
-        .tooltip-title {
-            font-weight: 600;
-            color: #4fc3f7;
-            margin-bottom: 8px;
-            font-size: 0.9em;
-        }
-
-        .tooltip-desc {
-            font-size: 0.8em;
-            line-height: 1.4;
-            color: #c9d1d9;
-            margin-bottom: 8px;
-        }
-
-        .tooltip-tech {
-            font-size: 0.75em;
-            color: #8b949e;
-            font-style: italic;
-            padding-top: 8px;
-            border-top: 1px solid #2a3f5f;
-        }
-
-        .component-progress {
-            margin-top: 8px;
-            height: 3px;
-            background: #1a1f3a;
-            border-radius: 2px;
-            overflow: hidden;
-        }
-
-        .progress-bar {
-            height: 100%;
-            background: linear-gradient(90deg, #4fc3f7, #66bb6a);
-            width: 0%;
-            transition: width 0.3s ease;
-        }
-
-        /* Horizontal Arrows */
-        .h-arrow {
-            flex-shrink: 0;
-            width: 28px;
-            height: 2.5px;
-            background: linear-gradient(90deg, #2a3f5f, #3a5f7f);
-            position: relative;
-            margin: 0 -1px;
-        }
-
-        .h-arrow::before {
-            content: '';
-            position: absolute;
-            left: 0;
-            top: 50%;
-            transform: translateY(-50%);
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, #4fc3f7);
-            opacity: 0;
-            transition: opacity 0.3s ease;
-        }
+    def reset(self):
+        """Reset all timing data."""
+        self.component_times.clear()
+        self.component_start_times.clear()
+        self._percentages_cache = None
 
-        .h-arrow::after {
-            content: '';
-            position: absolute;
-            right: -7px;
-            top: 50%;
-            transform: translateY(-50%);
-            width: 0;
-            height: 0;
-            border-left: 9px solid #3a5f7f;
-            border-top: 5px solid transparent;
-            border-bottom: 5px solid transparent;
-            filter: drop-shadow(0 0 3px rgba(79, 195, 247, 0.3));
-        }
 
-        .h-arrow.active::before {
-            opacity: 1;
-        }
+timing_tracker = TimingTracker()
 
-        .h-arrow.active {
-            background: linear-gradient(90deg, #4fc3f7, #66bb6a);
-            box-shadow: 0 0 8px rgba(79, 195, 247, 0.4);
-            animation: flow-horizontal 2s ease-in-out infinite;
-        }
 
-        .h-arrow.active::after {
-            border-left-color: #66bb6a;
-            filter: drop-shadow(0 0 6px rgba(102, 187, 106, 0.6));
-        }
+class ConnectionManager:
+    """
+    Manage WebSocket connections for real-time updates.
 
-        .h-arrow.inactive {
-            opacity: 0.2;
-            filter: grayscale(80%);
-        }
+    Each client gets a bounded outgoing queue drained by its own writer
+    task, so broadcast() never waits on a slow client. When a client's
+    queue is full the oldest pending frame is dropped. The writer drains
+    everything queued since its last send into one batch frame, so bursts
+    cost one socket write while a quiet stream still goes out immediately.
 
-        @keyframes flow-horizontal {
-            0%, 100% {
-                opacity: 0.7;
-                box-shadow: 0 0 8px rgba(79, 195, 247, 0.1);
-            }
-            50% {
-                opacity: 1;
-                box-shadow: 0 0 12px rgba(79, 195, 247, 0.15);
-            }
-        }
+    Clients that request the "msgpack" WebSocket subprotocol (and the
+    server has msgpack installed) get MessagePack frames; everyone else
+    gets UTF-8 JSON bytes.
+    """
 
-        /* Row break - simple visual separator */
-        .row-break {
-            width: 100%;
-            height: 18px;
-            position: relative;
-            margin: 3px 0;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }
+    __slots__ = ("active_connections", "queue_size", "_queues", "_writers", "_formats")
 
-        .corner-connector {
-            width: 3px;
-            height: 16px;
-            background: linear-gradient(180deg, #4fc3f7, #3a5f7f);
-            position: relative;
-            border-radius: 2px;
-            box-shadow: 0 0 6px rgba(79, 195, 247, 0.4);
-            transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-        }
+    def __init__(self, queue_size: int = 64):
+        self.active_connections: Set[WebSocket] = set()
+        self.queue_size = queue_size
+        self._queues: Dict[WebSocket, asyncio.Queue] = {}
+        self._writers: Dict[WebSocket, asyncio.Task] = {}
+        self._formats: Dict[WebSocket, str] = {}
 
-        .corner-connector.active {
-            background: linear-gradient(180deg, #66bb6a, #4a8f4e);
-            box-shadow: 0 0 12px rgba(102, 187, 106, 0.6);
-            animation: pulse-connector 2s ease-in-out infinite;
-        }
+    async def connect(self, websocket: WebSocket):
+        if "msgpack" in websocket.scope.get("subprotocols", []) and "msgpack" in _ENCODERS:
+            await websocket.accept(subprotocol="msgpack")
+            self._formats[websocket] = "msgpack"
+        else:
+            await websocket.accept()
+            self._formats[websocket] = "json"
 
-        @keyframes pulse-connector {
-            0%, 100% {
-                box-shadow: 0 0 8px rgba(102, 187, 106, 0.125);
-                transform: scaleY(1);
-            }
-            50% {
-                box-shadow: 0 0 16px rgba(102, 187, 106, 0.2);
-                transform: scaleY(1.1);
-            }
-        }
+        self.active_connections.add(websocket)
+        self._queues[websocket] = asyncio.Queue(maxsize=self.queue_size)
+        self._writers[websocket] = asyncio.create_task(self._writer(websocket))
+        logger.info(f"Client connected. Total: {len(self.active_connections)}")
 
-        .corner-connector::after {
-            content: '';
-            position: absolute;
-            bottom: -6px;
-            left: 50%;
-            transform: translateX(-50%);
-            width: 0;
-            height: 0;
-            border-top: 8px solid #3a5f7f;
-            border-left: 5px solid transparent;
-            border-right: 5px solid transparent;
-            filter: drop-shadow(0 0 4px rgba(79, 195, 247, 0.4));
-            transition: all 0.4s ease;
-        }
+    def disconnect(self, websocket: WebSocket):
+        # May be called by both the receive loop and a failed writer
+        if websocket not in self._queues:
+            return
+
+        self.active_connections.discard(websocket)
+        del self._queues[websocket]
+        del self._formats[websocket]
+        writer = self._writers.pop(websocket)
+        if writer is not asyncio.current_task():
+            writer.cancel()
+        logger.info(f"Client disconnected. Total: {len(self.active_connections)}")
 
-        .corner-connector.active::after {
-            border-top-color: #4a8f4e;
-            filter: drop-shadow(0 0 8px rgba(102, 187, 106, 0.7));
-        }
+    async def _writer(self, websocket: WebSocket):
+        """Drain one client's queue onto its socket until it fails or is cancelled."""
+        queue = self._queues[websocket]
+        batch = _BATCHERS[self._formats[websocket]]
+        try:
+            while True:
+                payloads = [await queue.get()]
+                while not queue.empty():
+                    payloads.append(queue.get_nowait())
+                await websocket.send_bytes(payloads[0] if len(payloads) == 1 else batch(payloads))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending to client: {e}")
+            self.disconnect(websocket)
 
-        /* Control Panel */
-        .form-group {
-            margin-bottom: 6px;
-        }
-        .form-row {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 8px;
-            margin-bottom: 6px;
-        }
-        .form-row .form-group {
-            margin-bottom: 0;
-        }
-        label {
-            display: block;
-            margin-bottom: 2px;
-            color: #b0b0b0;
-            font-size: 0.7em;
-        }
-        input, textarea {
-            width: 100%;
-            padding: 5px 7px;
-            background: #243447;
-            border: 1px solid #2a3f5f;
-            border-radius: 4px;
-            color: #e0e0e0;
-            font-size: 0.8em;
-        }
-        select {
-            width: 100%;
-            padding: 5px 7px;
-            background: #243447;
-            border: 1px solid #2a3f5f;
-            border-radius: 4px;
-            color: #e0e0e0;
-            font-size: 0.8em;
-        }
-        input:focus, textarea:focus {
-            outline: none;
-            border-color: #4fc3f7;
-        }
-        button {
-            width: 100%;
-            padding: 9px 14px;
-            background: linear-gradient(135deg, #4fc3f7, #2196f3);
-            border: none;
-            border-radius: 6px;
-            color: white;
-            font-size: 0.9em;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            box-shadow: 0 3px 10px rgba(79, 195, 247, 0.3);
-            position: relative;
-            overflow: hidden;
-        }
-        button::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-            transition: left 0.5s ease;
-        }
-        button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(79, 195, 247, 0.5);
-        }
-        button:hover::before {
-            left: 100%;
-        }
-        button:active {
-            transform: translateY(0);
-            box-shadow: 0 2px 8px rgba(79, 195, 247, 0.3);
-        }
-        button:disabled {
-            background: linear-gradient(135deg, #555, #444);
-            cursor: not-allowed;
-            transform: none;
-            box-shadow: none;
-            opacity: 0.6;
-        }
+    async def broadcast(self, message: dict):
+        """Queue message for all connected clients (never blocks on a slow client)."""
+        if not self._queues:
+            return
 
-        /* Metrics */
-        .metrics {
-            display: grid;
-            grid-template-columns: repeat(2, 1fr);
-            gap: 6px;
-        }
-        .metric {
-            background: #243447;
-            padding: 6px 8px;
-            border-radius: 4px;
-            border-left: 2px solid #4fc3f7;
-        }
-        .metric-label {
-            font-size: 0.7em;
-            color: #b0b0b0;
-            margin-bottom: 2px;
-        }
-        .metric-value {
-            font-size: 1em;
-            font-weight: bold;
-            color: #4fc3f7;
-        }
+        # Serialize once per frame format, reuse the bytes for every client
+        encoded: Dict[str, bytes] = {}
 
-        /* Timeline */
-        .timeline {
-            max-height: 250px;
-            overflow-y: auto;
-        }
-        .timeline-entry {
-            padding: 6px 8px;
-            margin-bottom: 6px;
-            background: #243447;
-            border-radius: 4px;
-            border-left: 3px solid #4fc3f7;
-            font-size: 0.75em;
-        }
-        .timeline-time {
-            color: #66bb6a;
-            font-weight: 600;
-        }
+        # Iterate a snapshot so a disconnect can never resize the dict mid-loop
+        for websocket, queue in tuple(self._queues.items()):
+            fmt = self._formats[websocket]
+            payload = encoded.get(fmt)
+            if payload is None:
+                payload = encoded[fmt] = _ENCODERS[fmt](message)
 
-        /* Model Output Display */
-        .output-display {
-            text-align: center;
-            padding: 20px;
-        }
-        .output-display img {
-            max-width: 100%;
-            border-radius: 8px;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.5);
-        }
-        .output-display video {
-            max-width: 100%;
-            border-radius: 8px;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.5);
-        }
-        .output-display audio {
-            width: 100%;
-            margin: 10px 0;
-        }
-        .output-display pre {
-            text-align: left;
-            background: #1e2d3d;
-            padding: 15px;
-            border-radius: 6px;
-            overflow-x: auto;
-            max-height: 500px;
-            overflow-y: auto;
-        }
+            if queue.full():
+                queue.get_nowait()  # Drop oldest frame for a lagging client
+            queue.put_nowait(payload)
 
-        /* Mode Selector */
-        .mode-selector {
-            display: grid;
-            grid-template-columns: repeat(4, 1fr);
-            gap: 4px;
-            margin-bottom: 8px;
-        }
-        .mode-btn {
-            padding: 5px 6px;
-            background: #243447;
-            border: 2px solid #2a3f5f;
-            border-radius: 5px;
-            color: #b0b0b0;
-            font-size: 0.68em;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            text-align: center;
-            white-space: nowrap;
-        }
-        .mode-btn:hover {
-            border-color: #4fc3f7;
-            background: #2a3f5f;
-            transform: translateY(-1px);
-            box-shadow: 0 2px 8px rgba(79, 195, 247, 0.2);
-        }
-        .mode-btn.active {
-            background: linear-gradient(135deg, #4fc3f7, #2196f3);
-            border-color: #4fc3f7;
-            color: white;
-            box-shadow: 0 4px 12px rgba(79, 195, 247, 0.4);
-        }
 
-        /* Parameter Display */
-        .params-display {
-            display: grid;
-            grid-template-columns: repeat(3, 1fr);
-            gap: 4px;
-            margin-bottom: 8px;
-            padding: 6px;
-            background: #243447;
-            border-radius: 6px;
-            border: 1px solid #2a3f5f;
-        }
-        .param-item {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            font-size: 0.68em;
-            padding: 3px 6px;
-            background: #1a1f3a;
-            border-radius: 3px;
-        }
-        .param-label {
-            color: #8b949e;
-            font-weight: 500;
-        }
-        .param-value {
-            color: #4fc3f7;
-            font-weight: 600;
-            font-family: 'Courier New', monospace;
-        }
+manager = ConnectionManager()
 
-        /* Image Upload */
-        .image-upload {
-            margin-bottom: 8px;
-            display: none;
-        }
-        .image-upload.visible {
-            display: block;
-        }
-        .upload-zone {
-            border: 2px dashed #2a3f5f;
-            border-radius: 6px;
-            padding: 15px;
-            text-align: center;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            background: #243447;
-        }
-        .upload-zone:hover {
-            border-color: #4fc3f7;
-            background: #2a3f5f;
-        }
-        .upload-zone.has-image {
-            border-style: solid;
-            border-color: #66bb6a;
-        }
-        .upload-preview {
-            max-width: 100%;
-            max-height: 150px;
-            border-radius: 4px;
-            margin-top: 8px;
-        }
+# Coalescing of rapid same-component updates (the UI can't use more than ~20 FPS)
+_EMIT_INTERVAL = 0.05
+_TERMINAL_COMPONENTS = {"complete", "idle"}
+_last_component: Optional[str] = None
+_last_emit_ts = 0.0
 
-        .status {
-            text-align: center;
-            padding: 6px 8px;
-            background: #243447;
-            border-radius: 6px;
-            margin-bottom: 8px;
-            font-size: 0.85em;
-        }
-        .status.active {
-            background: #2a4f6f;
-            border: 1px solid #4fc3f7;
-        }
+# Identical consecutive states (ignoring timestamp) are skipped, except for a
+# heartbeat resend once _HEARTBEAT_INTERVAL has passed since the last broadcast
+_HEARTBEAT_INTERVAL = 1.0
+_last_emit_key: Optional[tuple] = None
+_pending_state: Optional[dict] = None
+_flush_handle: Optional[asyncio.TimerHandle] = None
 
-        /* Expandable API Call Section */
-        .api-call-expandable {
-            margin: 12px 0;
-            border: 1px solid #2a3f5f;
-            border-radius: 6px;
-            background: #1a1f3a;
-            overflow: hidden;
-        }
-        .api-call-toggle {
-            padding: 10px 14px;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            background: linear-gradient(145deg, #1e2d3d 0%, #1a2532 100%);
-            transition: all 0.3s ease;
-            user-select: none;
-        }
-        .api-call-toggle:hover {
-            background: linear-gradient(145deg, #243447 0%, #1e2d3d 100%);
-        }
-        .api-call-toggle-text {
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            color: #4fc3f7;
-            font-weight: 600;
-            font-size: 0.85em;
-        }
-        .api-call-arrow {
-            color: #2a3f5f;
-            font-size: 0.9em;
-            transition: transform 0.3s ease;
-        }
-        .api-call-arrow.expanded {
-            transform: rotate(180deg);
-        }
-        .api-call-content {
-            max-height: 0;
-            overflow: hidden;
-            transition: max-height 0.3s ease;
-        }
-        .api-call-content.expanded {
-            max-height: 300px;
-        }
-        .api-call-inner {
-            padding: 12px;
-            background: #0d1117;
-            border-top: 1px solid #2a3f5f;
-            font-family: 'Monaco', 'Courier New', monospace;
-            font-size: 0.7em;
-            color: #58a6ff;
-            overflow-x: auto;
-            overflow-y: auto;
-            max-height: 280px;
-        }
 
-        /* Model Insights Panel */
-        .insights-grid {
-            display: grid;
-            grid-template-columns: 1fr;
-            gap: 10px;
-            margin-top: 8px;
-        }
-        .insight-card {
-            background: linear-gradient(135deg, #1e2d3d 0%, #1a2532 100%);
-            border: 1px solid #2a3f5f;
-            border-radius: 6px;
-            padding: 10px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.3);
-        }
-        .insight-card h3 {
-            font-size: 0.8em;
-            color: #4fc3f7;
-            margin: 0 0 8px 0;
-            font-weight: 600;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-            border-bottom: 2px solid #2a3f5f;
-            padding-bottom: 6px;
-        }
-        .insight-row {
-            display: flex;
-            justify-content: space-between;
-            padding: 4px 0;
-            border-bottom: 1px solid #1a2532;
-            font-size: 0.8em;
-        }
-        .insight-row:last-child {
-            border-bottom: none;
-        }
-        .insight-label {
-            color: #8b949e;
-            font-weight: 500;
-        }
-        .insight-value {
-            color: #c9d1d9;
-            font-weight: 600;
-            text-align: right;
-        }
-        .insight-value.highlight {
-            color: #4fc3f7;
-        }
-        .performance-bar {
-            background: #1a2532;
-            border-radius: 4px;
-            height: 8px;
-            margin-top: 6px;
-            overflow: hidden;
-            position: relative;
-        }
-        .performance-bar-fill {
-            background: linear-gradient(90deg, #4fc3f7 0%, #2196f3 100%);
-            height: 100%;
-            transition: width 0.5s ease;
-            border-radius: 4px;
-        }
-        .stage-metric {
-            background: #0d1117;
-            border-radius: 4px;
-            padding: 6px 10px;
-            margin-bottom: 6px;
-            border-left: 3px solid #4fc3f7;
-        }
-        .stage-metric:last-child {
-            margin-bottom: 0;
-        }
-        .stage-name {
-            font-size: 0.7em;
-            color: #8b949e;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-            margin-bottom: 3px;
-        }
-        .stage-stats {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        .stage-time {
-            font-size: 0.85em;
-            color: #c9d1d9;
-            font-weight: 600;
-        }
-        .stage-percentage {
-            font-size: 0.7em;
-            color: #4fc3f7;
-            font-weight: 600;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>🎨 Image Generation Pipeline Visualizer</h1>
-
-        <div class="status" id="status">Ready to generate</div>
-
-        <div class="grid control-flow" style="align-items: start;">
-            <!-- Left Column (1fr): Control Panel and Model Insights -->
-            <div>
-                <!-- Control Panel (FIRST) -->
-                <div class="panel">
-                    <h2>Control Panel</h2>
-
-                    <!-- Mode Selector -->
-                    <h3 style="margin: 0 0 6px 0; color: #b0b0b0; font-size: 0.8em;">AI Modality</h3>
-                    <div class="mode-selector">
-                        <div class="mode-btn active" data-mode="text2img" onclick="switchMode('text2img')">
-                            🎨 Text→Image
-                        </div>
-                        <div class="mode-btn" data-mode="img2img" onclick="switchMode('img2img')">
-                            🖼️ Image→Image
-                        </div>
-                        <div class="mode-btn" data-mode="controlnet" onclick="switchMode('controlnet')">
-                            🎯 Structure-Guided
-                        </div>
-                        <div class="mode-btn" data-mode="llm" onclick="switchMode('llm')">
-                            🤖 LLM Chat
-                        </div>
-                        <div class="mode-btn" data-mode="text2audio" onclick="switchMode('text2audio')">
-                            🔊 Text→Audio
-                        </div>
-                        <div class="mode-btn" data-mode="audio2text" onclick="switchMode('audio2text')">
-                            🎤 Audio→Text
-                        </div>
-                        <div class="mode-btn" data-mode="text2video" onclick="switchMode('text2video')">
-                            🎬 Text→Video
-                        </div>
-                        <div class="mode-btn" data-mode="img2video" onclick="switchMode('img2video')">
-                            📹 Image→Video
-                        </div>
-                    </div>
-
-                    <!-- Image Upload (shown for img2img and controlnet modes) -->
-                    <div class="image-upload" id="imageUpload">
-                        <label style="margin-bottom: 6px; display: block; color: #b0b0b0; font-size: 0.8em;">Reference Image</label>
-                        <div class="upload-zone" id="uploadZone" onclick="document.getElementById('fileInput').click()">
-                            <div id="uploadText">
-                                📁 Click to upload image<br>
-                                <span style="font-size: 0.8em; color: #8b949e;">or drag and drop</span>
-                            </div>
-                            <img id="uploadPreview" class="upload-preview" style="display: none;">
-                        </div>
-                        <input type="file" id="fileInput" accept="image/*" style="display: none;" onchange="handleImageUpload(event)">
-                    </div>
-
-                    <form id="generateForm">
-                        <div class="form-group">
-                            <label>Prompt</label>
-                            <textarea id="prompt" rows="2" placeholder="creative prompt will be generated..." title="Describe what you want to generate. Be specific about subject, style, lighting, and atmosphere for best results."></textarea>
-                        </div>
-
-                        <div class="form-row">
-                            <div class="form-group">
-                                <label>Steps: <span id="stepsValue">30</span></label>
-                                <input type="range" id="steps" min="5" max="50" value="30" step="5" title="Number of denoising iterations. More steps = higher quality but slower generation. Recommended: 20-40 steps.">
-                            </div>
-
-                            <div class="form-group">
-                                <label>Guidance Scale: <span id="guidanceValue">7.5</span></label>
-                                <input type="range" id="guidance" min="1" max="20" value="7.5" step="0.5" title="How closely the model follows your prompt. Higher values = stricter adherence to prompt. Recommended: 7-10 for balanced results.">
-                            </div>
-                        </div>
-
-                        <div class="form-row">
-                            <div class="form-group">
-                                <label>Image Size</label>
-                                <select id="imageSize" title="Output resolution. Larger sizes take more time and memory. 1024x1024 is the sweet spot for quality and speed.">
-                                    <option value="512x512">512×512 (Fast)</option>
-                                    <option value="768x768">768×768</option>
-                                    <option value="1024x1024" selected>1024×1024 (Default)</option>
-                                    <option value="1024x768">1024×768 (Landscape)</option>
-                                    <option value="768x1024">768×1024 (Portrait)</option>
-                                </select>
-                            </div>
-
-                            <div class="form-group">
-                                <label>Seed (optional)</label>
-                                <input type="text" id="seed" placeholder="42" title="Random seed for reproducibility. Use the same seed with identical settings to recreate the same image. Leave empty for random results.">
-                            </div>
-                        </div>
-
-                        <button type="submit" id="generateBtn" title="Start generating your image. The pipeline visualization will show real-time progress through each stage.">Generate Image</button>
-                    </form>
-
-                    <h2 style="margin-top: 15px; margin-bottom: 8px; font-size: 1em;">Generation Progress</h2>
-                    <div class="metrics" id="metrics">
-                        <div class="metric">
-                            <div class="metric-label">Progress</div>
-                            <div class="metric-value" id="progressDisplay">0/30</div>
-                        </div>
-                        <div class="metric">
-                            <div class="metric-label">Elapsed Time</div>
-                            <div class="metric-value" id="elapsedTime">0s</div>
-                        </div>
-                        <div class="metric">
-                            <div class="metric-label">Time/Step</div>
-                            <div class="metric-value" id="timePerStep">0s</div>
-                        </div>
-                        <div class="metric">
-                            <div class="metric-label">Est. Remaining</div>
-                            <div class="metric-value" id="estRemaining">—</div>
-                        </div>
-                    </div>
-                </div>
-
-                <!-- Model Insights & Performance Metrics Panel (SECOND) -->
-                <div class="panel" style="margin-top: 15px;">
-                    <h2>📊 Model Insights & Performance Metrics</h2>
-
-                    <div class="insights-grid">
-                        <!-- Model Information Card -->
-                        <div class="insight-card">
-                            <h3>🤖 Model Information</h3>
-                            <div class="insight-row">
-                                <span class="insight-label">Model Name:</span>
-                                <span class="insight-value" id="modelName">Stable Diffusion XL</span>
-                            </div>
-                            <div class="insight-row">
-                                <span class="insight-label">Architecture:</span>
-                                <span class="insight-value" id="modelArchitecture">Latent Diffusion</span>
-                            </div>
-                            <div class="insight-row">
-                                <span class="insight-label">Parameters:</span>
-                                <span class="insight-value" id="modelParameters">2.6B</span>
-                            </div>
-                            <div class="insight-row">
-                                <span class="insight-label">License:</span>
-                                <span class="insight-value" id="modelLicense">OpenRAIL-M</span>
-                            </div>
-                            <div class="insight-row">
-                                <span class="insight-label">Modality:</span>
-                                <span class="insight-value highlight" id="modelModality">Text-to-Image</span>
-                            </div>
-                        </div>
-
-                        <!-- Performance Summary Card -->
-                        <div class="insight-card">
-                            <h3>⚡ Performance Summary</h3>
-                            <div class="insight-row">
-                                <span class="insight-label">Total Time:</span>
-                                <span class="insight-value highlight" id="perfTotalTime">—</span>
-                            </div>
-                            <div class="insight-row">
-                                <span class="insight-label">Image Size:</span>
-                                <span class="insight-value" id="perfImageSize">1024×1024</span>
-                            </div>
-                            <div class="insight-row">
-                                <span class="insight-label">Inference Steps:</span>
-                                <span class="insight-value" id="perfSteps">30</span>
-                            </div>
-                            <div class="insight-row">
-                                <span class="insight-label">Time per Step:</span>
-                                <span class="insight-value" id="perfTimePerStep">—</span>
-                            </div>
-                            <div class="insight-row">
-                                <span class="insight-label">Device:</span>
-                                <span class="insight-value" id="perfDevice">MPS</span>
-                            </div>
-                        </div>
-
-                        <!-- Pipeline Stage Breakdown Card -->
-                        <div class="insight-card">
-                            <h3>🔄 Pipeline Stage Breakdown</h3>
-                            <div id="stageBreakdown">
-                                <div class="stage-metric">
-                                    <div class="stage-name">Input & Validation</div>
-                                    <div class="stage-stats">
-                                        <span class="stage-time" id="stageInputTime">—</span>
-                                        <span class="stage-percentage" id="stageInputPct">—%</span>
-                                    </div>
-                                    <div class="performance-bar">
-                                        <div class="performance-bar-fill" id="stageInputBar" style="width: 0%"></div>
-                                    </div>
-                                </div>
-                                <div class="stage-metric">
-                                    <div class="stage-name">Encoding (Text/Image)</div>
-                                    <div class="stage-stats">
-                                        <span class="stage-time" id="stageEncodingTime">—</span>
-                                        <span class="stage-percentage" id="stageEncodingPct">—%</span>
-                                    </div>
-                                    <div class="performance-bar">
-                                        <div class="performance-bar-fill" id="stageEncodingBar" style="width: 0%"></div>
-                                    </div>
-                                </div>
-                                <div class="stage-metric">
-                                    <div class="stage-name">Processing Core (UNet)</div>
-                                    <div class="stage-stats">
-                                        <span class="stage-time" id="stageProcessingTime">—</span>
-                                        <span class="stage-percentage" id="stageProcessingPct">—%</span>
-                                    </div>
-                                    <div class="performance-bar">
-                                        <div class="performance-bar-fill" id="stageProcessingBar" style="width: 0%"></div>
-                                    </div>
-                                </div>
-                                <div class="stage-metric">
-                                    <div class="stage-name">Decoding (VAE)</div>
-                                    <div class="stage-stats">
-                                        <span class="stage-time" id="stageDecodingTime">—</span>
-                                        <span class="stage-percentage" id="stageDecodingPct">—%</span>
-                                    </div>
-                                    <div class="performance-bar">
-                                        <div class="performance-bar-fill" id="stageDecodingBar" style="width: 0%"></div>
-                                    </div>
-                                </div>
-                                <div class="stage-metric">
-                                    <div class="stage-name">Output & Save</div>
-                                    <div class="stage-stats">
-                                        <span class="stage-time" id="stageOutputTime">—</span>
-                                        <span class="stage-percentage" id="stageOutputPct">—%</span>
-                                    </div>
-                                    <div class="performance-bar">
-                                        <div class="performance-bar-fill" id="stageOutputBar" style="width: 0%"></div>
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-
-                        <!-- Educational Insights Card -->
-                        <div class="insight-card">
-                            <h3>💡 Educational Insights</h3>
-                            <div id="educationalInsights" style="font-size: 0.85em; line-height: 1.6; color: #c9d1d9;">
-                                <p style="margin: 0 0 10px 0;">
-                                    <strong style="color: #4fc3f7;">Stable Diffusion XL</strong> uses a latent diffusion approach
-                                    where the image generation happens in a compressed "latent space" rather than pixel space.
-                                </p>
-                                <p style="margin: 0 0 10px 0;">
-                                    This makes it ~8x faster and more memory-efficient than pixel-based approaches while
-                                    maintaining high quality output.
-                                </p>
-                                <p style="margin: 0;">
-                                    The UNet denoising process typically takes 70-85% of total generation time, which is why
-                                    reducing inference steps has the biggest impact on performance.
-                                </p>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-
-            <!-- Right Column: Pipeline Flowchart -->
-            <div>
-                <!-- Pipeline Flowchart -->
-                <div class="panel">
-                    <h2>AI Pipeline Flow - All Modalities</h2>
-                    <div class="pipeline-comprehensive" id="pipeline">
-
-                    <!-- HORIZONTAL ROW: INPUT and ENCODING side-by-side -->
-                    <div class="pipeline-row-wrapper">
-                        <!-- INPUT STAGE (Column 1) -->
-                        <div class="pipeline-stage">
-                            <div class="stage-header">INPUT STAGE</div>
-                            <div class="flowchart-row">
-                                <div class="component" data-component="input" data-path="all">
-                                    <div class="component-name">📝 Start</div>
-                                    <div class="component-desc">User Input</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">Input Processing</div>
-                                        <div class="tooltip-desc">Entry point for all AI modalities. Receives user input (text prompt, image, audio) along with generation parameters.</div>
-                                        <div class="tooltip-tech">Interface: REST API endpoint accepting multiple content types</div>
-                                    </div>
-                                </div>
-                                <div class="h-arrow" data-path="all"></div>
-                                <div class="component" data-component="api" data-path="all">
-                                    <div class="component-name">🔌 API</div>
-                                    <div class="component-desc">Validate Request</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">API Handler</div>
-                                        <div class="tooltip-desc">Validates and parses request parameters. Routes to appropriate processing pipeline based on modality. Sets defaults (size, steps, guidance).</div>
-                                        <div class="tooltip-tech">Technology: FastAPI with Pydantic validation</div>
-                                    </div>
-                                </div>
-                            </div>
-
-                            <!-- Expandable API Call Details -->
-                            <div class="api-call-expandable">
-                                <div class="api-call-toggle" onclick="toggleApiCall()">
-                                    <div class="api-call-toggle-text">
-                                        <span>📡</span>
-                                        <span>View Exact API Call to Model</span>
-                                    </div>
-                                    <div class="api-call-arrow" id="apiCallArrow">▼</div>
-                                </div>
-                                <div class="api-call-content" id="apiCallContent">
-                                    <div class="api-call-inner" id="apiCallDetails">
-                                        <p style="color: #8b949e;">Waiting for generation request...</p>
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-
-                        <!-- Horizontal connector -->
-                        <div class="horizontal-stage-connector">
-                            <div class="horizontal-connector-label">BRANCH BY TYPE →</div>
-                        </div>
-
-                        <!-- ENCODING BRANCHES (Column 2) -->
-                        <div class="pipeline-stage">
-                        <div class="stage-header">ENCODING</div>
-
-                        <div class="stage-grid">
-                            <!-- Text Path Column -->
-                            <div class="stage-grid-column">
-                                <div class="stage-grid-column-header">Text Path</div>
-                                <div class="component" data-component="text-encode" data-path="text2img,text2audio,text2video,llm,controlnet">
-                                    <div class="component-name">🔤 Tokenize</div>
-                                    <div class="component-desc">Text → Tokens</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">Tokenization</div>
-                                        <div class="tooltip-desc">Converts text prompt into numerical tokens. Splits text into subwords, maps each to an ID from vocabulary.</div>
-                                        <div class="tooltip-tech">Tokenizer: BPE (Byte-Pair Encoding)<br>Vocab size: 49,408 tokens<br>Max length: 77 tokens</div>
-                                    </div>
-                                </div>
-                                <div class="seq-arrow"></div>
-                                <div class="component" data-component="text-embed" data-path="text2img,text2audio,text2video,controlnet">
-                                    <div class="component-name">📊 Embed</div>
-                                    <div class="component-desc">CLIP Encoding</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">Text Embedding (CLIP)</div>
-                                        <div class="tooltip-desc">Converts tokens into dense meaning vectors. Each token becomes a 768-dimensional vector capturing semantic meaning.</div>
-                                        <div class="tooltip-tech">Model: CLIP Text Encoder<br>Embedding dim: 768<br>Transformer layers: 12<br>Output: 77×768 tensor</div>
-                                    </div>
-                                </div>
-                            </div>
-
-                            <!-- Image Path Column -->
-                            <div class="stage-grid-column">
-                                <div class="stage-grid-column-header">Image Path</div>
-                                <div class="component" data-component="image-encode" data-path="img2img,img2video,controlnet">
-                                    <div class="component-name">🖼️ Load Image</div>
-                                    <div class="component-desc">Image Input</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">Image Loading & Preprocessing</div>
-                                        <div class="tooltip-desc">Loads input image, converts to RGB, resizes to match model requirements (typically 1024×1024). Normalizes pixel values.</div>
-                                        <div class="tooltip-tech">Input formats: PNG, JPG, WebP<br>Color space: RGB (3 channels)<br>Typical size: 1024×1024×3</div>
-                                    </div>
-                                </div>
-                                <div class="seq-arrow"></div>
-                                <div class="component" data-component="vae-encode" data-path="img2img,img2video">
-                                    <div class="component-name">🔧 VAE Encode</div>
-                                    <div class="component-desc">Image → Latents</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">VAE Encoder (Compression)</div>
-                                        <div class="tooltip-desc">Compresses the image into compact latent space. Reduces 1024×1024×3 image to 128×128×4 latents (64× smaller!).</div>
-                                        <div class="tooltip-tech">Compression: 8× per dimension<br>Output: 128×128×4 latents<br>Size reduction: 3.1M → 65K values</div>
-                                    </div>
-                                </div>
-                            </div>
-
-                            <!-- Audio Path Column -->
-                            <div class="stage-grid-column">
-                                <div class="stage-grid-column-header">Audio Path</div>
-                                <div class="component" data-component="audio-encode" data-path="audio2text">
-                                    <div class="component-name">🎤 Audio Input</div>
-                                    <div class="component-desc">Audio Signal</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">Audio Input & Preprocessing</div>
-                                        <div class="tooltip-desc">Loads audio file and resamples to standard rate (typically 16kHz for speech recognition). Converts to mono channel if stereo.</div>
-                                        <div class="tooltip-tech">Input formats: WAV, MP3, FLAC<br>Sample rate: 16,000 Hz<br>Channels: Mono (1 channel)</div>
-                                    </div>
-                                </div>
-                                <div class="seq-arrow"></div>
-                                <div class="component" data-component="audio-features" data-path="audio2text">
-                                    <div class="component-name">📈 Features</div>
-                                    <div class="component-desc">Spectrogram</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">Audio Feature Extraction</div>
-                                        <div class="tooltip-desc">Converts time-domain audio waveform into frequency-domain spectrogram using Mel-scale filterbank.</div>
-                                        <div class="tooltip-tech">Transform: STFT<br>Mel filters: 80 or 128 bands<br>Output: Time×Frequency matrix</div>
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                    </div><!-- End of pipeline-row-wrapper -->
-
-                    <!-- L-shaped Flow connector: ENCODING → PROCESSING -->
-                    <div style="position: relative; height: 120px; margin: 0;">
-                        <!-- SVG path for clear L-shaped flow -->
-                        <svg style="position: absolute; width: 100%; height: 100%; pointer-events: none;" viewBox="0 0 100 100" preserveAspectRatio="none">
-                            <!-- Gradient for stroke -->
-                            <defs>
-                                <linearGradient id="pathGradient1" x1="0%" y1="0%" x2="0%" y2="100%">
-                                    <stop offset="0%" style="stop-color:#2a3f5f;stop-opacity:1" />
-                                    <stop offset="100%" style="stop-color:#4fc3f7;stop-opacity:1" />
-                                </linearGradient>
-                            </defs>
-                            <!-- Path from right (ENCODING) down, left, down to left (PROCESSING) -->
-                            <path d="M 75 0 L 75 30 L 25 30 L 25 100"
-                                  stroke="url(#pathGradient1)"
-                                  stroke-width="1"
-                                  fill="none"
-                                  stroke-linecap="round"
-                                  stroke-linejoin="round"
-                                  style="filter: drop-shadow(0 0 5px rgba(79, 195, 247, 0.6));"/>
-                            <!-- Arrow at end -->
-                            <polygon points="25,100 21,93 29,93"
-                                     fill="#4fc3f7"
-                                     style="filter: drop-shadow(0 0 5px rgba(79, 195, 247, 0.6));"/>
-                        </svg>
-                        <!-- Label -->
-                        <div class="vertical-connector-label">PROCESS</div>
-                    </div>
-
-                    <!-- HORIZONTAL ROW: PROCESSING and DECODING side-by-side -->
-                    <div class="pipeline-row-wrapper">
-                        <!-- PROCESSING CORE (Column 1) -->
-                        <div class="pipeline-stage">
-                        <div class="stage-header">PROCESSING CORE</div>
-
-                        <div class="stage-grid">
-                            <!-- Diffusion Column -->
-                            <div class="stage-grid-column">
-                                <div class="stage-grid-column-header">Image/Video</div>
-                                <div class="component" data-component="diffusion" data-path="text2img,img2img,text2video,img2video,controlnet">
-                                    <div class="component-name">🎨 Diffusion</div>
-                                    <div class="component-desc">UNet Denoising</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="component-progress"><div class="progress-bar"></div></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">Diffusion Process</div>
-                                        <div class="tooltip-desc">Iteratively removes noise from random latents guided by text. UNet predicts noise at each step.</div>
-                                        <div class="tooltip-tech">UNet: 2.6B parameters<br>Steps: 20-50<br>Time: ~2-3 sec/step</div>
-                                    </div>
-                                </div>
-                            </div>
-
-                            <!-- LLM Column -->
-                            <div class="stage-grid-column">
-                                <div class="stage-grid-column-header">Text Generation</div>
-                                <div class="component" data-component="llm-inference" data-path="llm">
-                                    <div class="component-name">🧠 Inference</div>
-                                    <div class="component-desc">Attention Layers</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">LLM Inference</div>
-                                        <div class="tooltip-desc">Generates text token-by-token using transformer attention layers. Each layer applies self-attention to understand context and feed-forward networks to predict the next token.</div>
-                                        <div class="tooltip-tech">Architecture: Decoder-only transformer<br>Layers: 32-80 (depending on model)<br>Generation speed: 20-100 tokens/sec</div>
-                                    </div>
-                                </div>
-                            </div>
-
-                            <!-- Audio Column -->
-                            <div class="stage-grid-column">
-                                <div class="stage-grid-column-header">Audio Processing</div>
-                                <div class="component" data-component="tts-synthesis" data-path="text2audio">
-                                    <div class="component-name">🔊 Synthesize</div>
-                                    <div class="component-desc">TTS Model</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">Text-to-Speech Synthesis</div>
-                                        <div class="tooltip-desc">Converts text into mel-spectrogram representations using neural TTS models. Models rhythm, pitch, and intonation to produce natural-sounding speech patterns.</div>
-                                        <div class="tooltip-tech">Model: Tacotron 2 or FastSpeech<br>Output: Mel-spectrogram (80 bins)<br>Time: ~0.5-1.0 seconds for short phrases</div>
-                                    </div>
-                                </div>
-                                <div class="component" data-component="asr-model" data-path="audio2text">
-                                    <div class="component-name">🎧 Recognize</div>
-                                    <div class="component-desc">ASR Model</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">Automatic Speech Recognition</div>
-                                        <div class="tooltip-desc">Transcribes audio into text using encoder-decoder architecture. The encoder processes audio features while the decoder generates text tokens.</div>
-                                        <div class="tooltip-tech">Model: Whisper or similar<br>Languages: 100+<br>Accuracy: ~95%+ on clean audio</div>
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-
-                        <!-- Horizontal connector -->
-                        <div class="horizontal-stage-connector">
-                            <div class="horizontal-connector-label">DECODE →</div>
-                        </div>
-
-                        <!-- DECODING STAGE (Column 2) -->
-                        <div class="pipeline-stage">
-                        <div class="stage-header">DECODING</div>
-
-                        <div class="stage-grid">
-                            <!-- Image Output Column -->
-                            <div class="stage-grid-column">
-                                <div class="stage-grid-column-header">Image Output</div>
-                                <div class="component" data-component="vae-decode" data-path="text2img,img2img,text2video,img2video,controlnet">
-                                    <div class="component-name">🖼️ VAE Decode</div>
-                                    <div class="component-desc">Latents → Pixels</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">VAE Decoder</div>
-                                        <div class="tooltip-desc">Transforms compressed latent representation (128×128×4) back to full-resolution pixels (1024×1024×3). Trained to reconstruct images with minimal quality loss.</div>
-                                        <div class="tooltip-tech">Architecture: Convolutional decoder with upsampling<br>Compression: 8x spatial reduction<br>Time: ~0.2-0.4 seconds</div>
-                                    </div>
-                                </div>
-                            </div>
-
-                            <!-- Audio Output Column -->
-                            <div class="stage-grid-column">
-                                <div class="stage-grid-column-header">Audio Output</div>
-                                <div class="component" data-component="vocoder" data-path="text2audio">
-                                    <div class="component-name">🔈 Vocoder</div>
-                                    <div class="component-desc">Mel → Audio</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">Neural Vocoder</div>
-                                        <div class="tooltip-desc">Converts mel-spectrogram representation into raw audio waveforms. Uses neural networks (GAN or diffusion-based) to generate high-quality, natural-sounding speech.</div>
-                                        <div class="tooltip-tech">Type: HiFi-GAN or WaveGrad<br>Sampling rate: 22.05 kHz<br>Time: ~0.1-0.2 seconds</div>
-                                    </div>
-                                </div>
-                            </div>
-
-                            <!-- Text Output Column -->
-                            <div class="stage-grid-column">
-                                <div class="stage-grid-column-header">Text Output</div>
-                                <div class="component" data-component="text-decode" data-path="llm,audio2text">
-                                    <div class="component-name">📝 Detokenize</div>
-                                    <div class="component-desc">Tokens → Text</div>
-                                    <div class="component-timing"></div>
-                                    <div class="component-percentage"></div>
-                                    <div class="tooltip">
-                                        <div class="tooltip-title">Detokenization</div>
-                                        <div class="tooltip-desc">Converts token IDs back into readable text. Maps numerical tokens to their corresponding words/subwords using the model's vocabulary.</div>
-                                        <div class="tooltip-tech">Process: Token IDs → Vocabulary lookup → Text<br>Time: Near-instantaneous (&lt;0.01s)</div>
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                    </div><!-- End of pipeline-row-wrapper -->
-
-                    <!-- L-shaped Flow connector: DECODING → OUTPUT -->
-                    <div style="position: relative; height: 120px; margin: 0;">
-                        <!-- SVG path for clear L-shaped flow -->
-                        <svg style="position: absolute; width: 100%; height: 100%; pointer-events: none;" viewBox="0 0 100 100" preserveAspectRatio="none">
-                            <!-- Gradient for stroke -->
-                            <defs>
-                                <linearGradient id="pathGradient2" x1="0%" y1="0%" x2="0%" y2="100%">
-                                    <stop offset="0%" style="stop-color:#2a3f5f;stop-opacity:1" />
-                                    <stop offset="100%" style="stop-color:#4fc3f7;stop-opacity:1" />
-                                </linearGradient>
-                            </defs>
-                            <!-- Path from right (DECODING) down, left, down to center (OUTPUT) -->
-                            <path d="M 75 0 L 75 30 L 50 30 L 50 100"
-                                  stroke="url(#pathGradient2)"
-                                  stroke-width="1"
-                                  fill="none"
-                                  stroke-linecap="round"
-                                  stroke-linejoin="round"
-                                  style="filter: drop-shadow(0 0 5px rgba(79, 195, 247, 0.6));"/>
-                            <!-- Arrow at end -->
-                            <polygon points="50,100 46,93 54,93"
-                                     fill="#4fc3f7"
-                                     style="filter: drop-shadow(0 0 5px rgba(79, 195, 247, 0.6));"/>
-                        </svg>
-                        <!-- Label -->
-                        <div class="vertical-connector-label">FINALIZE</div>
-                    </div>
-
-                    <!-- OUTPUT STAGE (Common End) -->
-                    <div class="pipeline-stage">
-                        <div class="stage-header">OUTPUT</div>
-                        <div class="flowchart-row">
-                            <div class="component" data-component="output" data-path="all">
-                                <div class="component-name">✅ Complete</div>
-                                <div class="component-desc">Save & Return</div>
-                                <div class="component-timing"></div>
-                                <div class="component-percentage"></div>
-                                <div class="tooltip">
-                                    <div class="tooltip-title">Output & Completion</div>
-                                    <div class="tooltip-desc">Finalizes the generation process. Saves the output (image/text/audio/video) to disk and returns the result to the client via WebSocket.</div>
-                                    <div class="tooltip-tech">Output formats: PNG (images), MP3/WAV (audio), MP4 (video), Plain text (LLM)</div>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-
-                </div>
-                </div>
-
-            </div>
-        </div>
-
-        <!-- README Section -->
-        <div class="panel" style="margin-top: 15px;">
-            <h2>📖 Pipeline Documentation</h2>
-            <div style="font-size: 0.85em; line-height: 1.6; color: #c9d1d9;">
-                <h3 style="color: #4fc3f7; font-size: 1em; margin-bottom: 10px;">How Stable Diffusion XL Works</h3>
-
-                <p style="margin-bottom: 12px;">
-                    <strong>Stable Diffusion XL</strong> is a latent diffusion model that generates images from text descriptions.
-                    It works by gradually removing noise from random data, guided by your text prompt. Here's the complete process:
-                </p>
-
-                <div style="background: #243447; padding: 12px; border-radius: 6px; margin-bottom: 12px; border-left: 3px solid #4fc3f7;">
-                    <strong style="color: #4fc3f7;">Stage 1: Text Understanding</strong><br>
-                    Your prompt is processed by two CLIP encoders (ViT-L/14 and OpenCLIP-ViT-G/14) that convert words into numerical embeddings.
-                    These embeddings capture the semantic meaning of your text in a 2048-dimensional space with 77 tokens.
-                </div>
-
-                <div style="background: #243447; padding: 12px; border-radius: 6px; margin-bottom: 12px; border-left: 3px solid #66bb6a;">
-                    <strong style="color: #66bb6a;">Stage 2: Latent Diffusion (Core Process)</strong><br>
-                    Instead of working with full-resolution pixels (expensive!), SDXL works in a compressed "latent space" (128×128×4).
-                    Starting from pure random noise, the UNet neural network (2.6B parameters) predicts and removes noise over 20-50 steps.
-                    At each step, cross-attention mechanisms align the image with your text embeddings.
-                </div>
-
-                <div style="background: #243447; padding: 12px; border-radius: 6px; margin-bottom: 12px; border-left: 3px solid #ffa726;">
-                    <strong style="color: #ffa726;">Stage 3: Image Decoding</strong><br>
-                    The VAE (Variational Autoencoder) decoder transforms the latent representation back into full-resolution pixels (1024×1024×3 RGB).
-                    This decoder was trained to reconstruct images from compressed latents with minimal quality loss.
-                </div>
-
-                <h3 style="color: #4fc3f7; font-size: 1em; margin: 15px 0 10px 0;">Key Concepts</h3>
-
-                <ul style="margin: 0; padding-left: 20px; color: #8b949e;">
-                    <li><strong>Guidance Scale (7.5):</strong> How strongly the model follows your prompt vs. exploring creative variations. Higher = more literal.</li>
-                    <li><strong>Inference Steps (20-50):</strong> More steps = higher quality but slower. Each step refines the image incrementally.</li>
-                    <li><strong>Seed:</strong> Random number that determines the starting noise. Same seed + prompt = same image (deterministic).</li>
-                    <li><strong>Cross-Attention:</strong> The mechanism that "conditions" the image on your text. It determines which parts of the image correspond to which words.</li>
-                    <li><strong>Latent Space:</strong> Compressed representation (8x smaller) where diffusion happens. Makes generation faster and cheaper.</li>
-                </ul>
-
-                <h3 style="color: #4fc3f7; font-size: 1em; margin: 15px 0 10px 0;">Performance Notes</h3>
-
-                <ul style="margin: 0; padding-left: 20px; color: #8b949e;">
-                    <li><strong>Device:</strong> Auto-detects MPS (Apple Silicon), CUDA (NVIDIA), or CPU</li>
-                    <li><strong>Model Size:</strong> ~6.5GB in fp16 precision, ~13GB in fp32</li>
-                    <li><strong>Memory Usage:</strong> ~8-10GB during generation (including activations)</li>
-                    <li><strong>Speed:</strong> ~2-3 seconds per step on M1/M2 Max, ~0.5-1 sec on high-end NVIDIA GPUs</li>
-                    <li><strong>Total Time:</strong> 30 steps ≈ 60-90 seconds on Apple Silicon, 15-30 seconds on NVIDIA RTX 4090</li>
-                </ul>
-
-                <p style="margin-top: 12px; font-size: 0.8em; color: #66bb6a;">
-                    💡 <strong>Pro Tip:</strong> Hover over each component in the pipeline above to see detailed technical information!
-                </p>
-            </div>
-
-            <div>
-                <div class="panel">
-                    <h2>Model Output</h2>
-                    <div class="output-display" id="outputDisplay">
-                        <p style="color: #666;">Model output will appear here (image, video, text, or audio)</p>
-                    </div>
-                </div>
-            </div>
-
-        </div>
-    </div>
-
-    <script>
-        let ws = null;
-        let startTime = null;
-        let generating = false;
-
-        // Escape HTML for safe display
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
+def _flush_pending_state():
+    """Broadcast the latest state held back by emit_state's coalescing."""
+    global _pending_state, _flush_handle, _last_emit_ts
+    _flush_handle = None
+    if _pending_state is None:
+        return
 
-        // Global state
-        let currentMode = 'text2img';
-        let uploadedImage = null;
-
-        // Update block diagram visualization based on mode
-        function updateBlockDiagram(mode) {
-            // Comprehensive multi-path flowchart: show all paths, activate only the current one
-            console.log(`Updating flowchart for mode: ${mode}`);
-
-            // Update all components based on data-path attribute
-            document.querySelectorAll('[data-path]').forEach(element => {
-                const paths = element.dataset.path.split(',');
-                const isActive = paths.includes('all') || paths.includes(mode);
-
-                if (isActive) {
-                    element.classList.remove('inactive');
-                    element.classList.add('active');
-                } else {
-                    element.classList.add('inactive');
-                    element.classList.remove('active');
-                }
-            });
-
-            // Also update rows to fade out if no active components in them
-            document.querySelectorAll('.flowchart-row').forEach(row => {
-                const hasActiveComponent = row.querySelector('[data-path].active');
-                if (!hasActiveComponent) {
-                    row.style.opacity = '0.65';
-                } else {
-                    row.style.opacity = '1';
-                }
-            });
-        }
+    state, _pending_state = _pending_state, None
+    _last_emit_ts = time.monotonic()
+    asyncio.ensure_future(manager.broadcast(state))
 
-        // Toggle API Call expandable section
-        function toggleApiCall() {
-            const content = document.getElementById('apiCallContent');
-            const arrow = document.getElementById('apiCallArrow');
-
-            if (content.classList.contains('expanded')) {
-                content.classList.remove('expanded');
-                arrow.classList.remove('expanded');
-            } else {
-                content.classList.add('expanded');
-                arrow.classList.add('expanded');
-            }
-        }
 
-        // Update Model Insights panel based on current mode
-        function updateModelInsights(mode) {
-            const modelInfo = {
-                'text2img': {
-                    name: 'Stable Diffusion XL',
-                    architecture: 'Latent Diffusion',
-                    parameters: '3.5B',
-                    license: 'CreativeML OpenRAIL++',
-                    modality: 'Text → Image',
-                    insights: 'SDXL uses dual text encoders (CLIP ViT-L/14 and OpenCLIP ViT-G/14) for enhanced prompt understanding. The latent diffusion approach processes images in compressed 8x8 pixel blocks, making it ~8x faster than pixel-space diffusion while maintaining high quality.'
-                },
-                'img2img': {
-                    name: 'Stable Diffusion XL',
-                    architecture: 'Latent Diffusion',
-                    parameters: '3.5B',
-                    license: 'CreativeML OpenRAIL++',
-                    modality: 'Image → Image',
-                    insights: 'Image-to-image mode starts from your input image rather than pure noise. The "strength" parameter controls how much the original image is preserved (0.0 = no change, 1.0 = complete transformation). Lower strength values (0.3-0.5) are good for subtle modifications, while higher values (0.7-0.9) allow major changes.'
-                },
-                'controlnet': {
-                    name: 'Stable Diffusion XL + ControlNet',
-                    architecture: 'Conditioned Latent Diffusion',
-                    parameters: '3.5B + 1.2B',
-                    license: 'CreativeML OpenRAIL++',
-                    modality: 'Structure-Guided Generation',
-                    insights: 'ControlNet adds spatial conditioning to SDXL, allowing precise control over composition using edge maps, depth maps, or pose skeletons. The control structure guides the diffusion process while the text prompt defines the content, enabling highly controllable image generation.'
-                },
-                'llm': {
-                    name: 'Language Model',
-                    architecture: 'Transformer Decoder',
-                    parameters: '7B - 70B+',
-                    license: 'Various',
-                    modality: 'Text → Text',
-                    insights: 'Large Language Models use transformer-based architectures with attention mechanisms to generate coherent text. Modern LLMs can handle tasks like question answering, summarization, code generation, and creative writing through prompt-based interaction.'
-                },
-                'text2audio': {
-                    name: 'Text-to-Speech Model',
-                    architecture: 'Neural TTS',
-                    parameters: '200M - 1B',
-                    license: 'Various',
-                    modality: 'Text → Audio',
-                    insights: 'TTS models convert text to natural-sounding speech using neural vocoders. Modern approaches use transformers to model prosody (rhythm and intonation) and mel-spectrograms, then convert to waveforms using GAN-based or diffusion-based vocoders.'
-                },
-                'audio2text': {
-                    name: 'Whisper (OpenAI)',
-                    architecture: 'Encoder-Decoder Transformer',
-                    parameters: '1.5B',
-                    license: 'MIT',
-                    modality: 'Audio → Text',
-                    insights: 'Whisper uses a transformer encoder-decoder architecture trained on 680,000 hours of multilingual data. It can transcribe speech in 100+ languages, translate to English, and perform voice activity detection with state-of-the-art accuracy.'
-                },
-                'text2video': {
-                    name: 'Video Diffusion Model',
-                    architecture: 'Temporal Latent Diffusion',
-                    parameters: '5B - 10B',
-                    license: 'Various',
-                    modality: 'Text → Video',
-                    insights: 'Video diffusion models extend image diffusion to the temporal dimension, generating consistent frame sequences. They use 3D UNets or temporal attention layers to model motion and ensure temporal coherence across frames.'
-                },
-                'img2video': {
-                    name: 'Video Diffusion Model',
-                    architecture: 'Temporal Latent Diffusion',
-                    parameters: '5B - 10B',
-                    license: 'Various',
-                    modality: 'Image → Video',
-                    insights: 'Image-to-video models animate a single image by predicting plausible motion. They condition on the input frame and generate subsequent frames that maintain visual consistency while introducing realistic movement based on the text prompt.'
-                }
-            };
-
-            const info = modelInfo[mode] || modelInfo['text2img'];
-
-            // Update model information card
-            document.getElementById('modelName').textContent = info.name;
-            document.getElementById('modelArchitecture').textContent = info.architecture;
-            document.getElementById('modelParameters').textContent = info.parameters;
-            document.getElementById('modelLicense').textContent = info.license;
-            document.getElementById('modelModality').textContent = info.modality;
-
-            // Update educational insights
-            document.getElementById('educationalInsights').innerHTML = `
-                <p style="margin: 0; font-size: 0.85em; line-height: 1.6; color: #c9d1d9;">
-                    ${info.insights}
-                </p>
-            `;
-        }
+async def emit_state(component: str, progress: int = 0, total: int = 0, message: str = "", metrics: dict = None, api_call: str = None, component_timing: dict = None, component_percentages: dict = None):
+    """
+    Emit current state to all connected clients.
 
-        // Update performance metrics panel
-        function updatePerformanceMetrics(data) {
-            if (data.total_time) {
-                document.getElementById('perfTotalTime').textContent = `${data.total_time.toFixed(2)}s`;
-            }
-            if (data.image_size) {
-                document.getElementById('perfImageSize').textContent = data.image_size;
-            }
-            if (data.steps) {
-                document.getElementById('perfSteps').textContent = data.steps;
-                if (data.total_time) {
-                    const timePerStep = data.total_time / data.steps;
-                    document.getElementById('perfTimePerStep').textContent = `${timePerStep.toFixed(2)}s`;
-                }
-            }
-        }
+    Updates for the same component arriving within _EMIT_INTERVAL of the
+    last broadcast are coalesced: only the newest is sent, once the interval
+    elapses. Component transitions, completed steps (progress == total),
+    timing results and terminal states are always sent immediately.
 
-        // Update stage breakdown with timing data
-        function updateStageBreakdown(stageTimings) {
-            if (!stageTimings) return;
-
-            const totalTime = stageTimings.total || 1;
-
-            // Map component names to stage IDs
-            const stageMapping = {
-                'input': 'stageInput',
-                'text-encode': 'stageEncoding',
-                'text-embed': 'stageEncoding',
-                'image-encode': 'stageEncoding',
-                'diffusion': 'stageProcessing',
-                'vae-decode': 'stageDecoding',
-                'output': 'stageOutput'
-            };
-
-            // Aggregate timings by stage
-            const stageTotals = {
-                stageInput: 0,
-                stageEncoding: 0,
-                stageProcessing: 0,
-                stageDecoding: 0,
-                stageOutput: 0
-            };
-
-            // Sum up component times into stages
-            Object.keys(stageTimings).forEach(component => {
-                if (component !== 'total') {
-                    const stageId = stageMapping[component];
-                    if (stageId && stageTotals[stageId] !== undefined) {
-                        stageTotals[stageId] += stageTimings[component];
-                    }
-                }
-            });
-
-            // Update each stage
-            Object.keys(stageTotals).forEach(stageId => {
-                const time = stageTotals[stageId];
-                const percentage = totalTime > 0 ? (time / totalTime * 100) : 0;
-
-                const timeEl = document.getElementById(`${stageId}Time`);
-                const pctEl = document.getElementById(`${stageId}Pct`);
-                const barEl = document.getElementById(`${stageId}Bar`);
-
-                if (timeEl) timeEl.textContent = `${time.toFixed(2)}s`;
-                if (pctEl) pctEl.textContent = `${percentage.toFixed(1)}%`;
-                if (barEl) barEl.style.width = `${percentage}%`;
-            });
-        }
+    A state identical to the previous one (apart from its timestamp) is
+    dropped unless _HEARTBEAT_INTERVAL has passed since the last broadcast.
 
-        // Creative prompts for each mode (randomized on mode switch)
-        const creativePrompts = {
-            text2img: [
-                "a cyberpunk cityscape at sunset with neon lights reflecting on wet streets",
-                "a majestic dragon perched on a mountain peak overlooking misty valleys",
-                "an astronaut floating in a garden of bioluminescent flowers in space",
-                "a steampunk airship soaring through clouds above a Victorian city",
-                "a cozy library with floating books and magical glowing orbs",
-                "a mystical forest with giant mushrooms and fairy lights at twilight",
-                "a futuristic sports car racing through a tunnel of light and energy",
-                "an ancient temple hidden in a jungle with golden sunlight streaming through vines",
-                "a peaceful zen garden with a koi pond and cherry blossoms in full bloom",
-                "a retro-futuristic diner on Mars with robots serving milkshakes",
-                "a massive whale swimming through clouds above a sunset ocean",
-                "a crystal cave filled with rainbow-colored geodes and underground waterfalls",
-                "a medieval knight's armor displayed in a grand hall with dramatic lighting",
-                "a colorful hot air balloon festival at dawn over rolling hills",
-                "a underwater research station surrounded by curious sea creatures and coral reefs"
-            ],
-            text2audio: [
-                "gentle rain falling on a tin roof with distant thunder",
-                "a jazz saxophone solo in a smoky nightclub",
-                "ocean waves crashing on a rocky shore with seagulls calling",
-                "a crackling campfire with crickets chirping in the background",
-                "a busy coffee shop with espresso machines and quiet conversations",
-                "medieval tavern ambience with lute music and cheerful chatter",
-                "spaceship engine humming while traveling through hyperspace",
-                "a thunderstorm with heavy rain and frequent lightning cracks"
-            ],
-            text2video: [
-                "a time-lapse of clouds forming into a dramatic storm over the ocean",
-                "a flower blooming from bud to full bloom in accelerated time",
-                "a bustling Tokyo street at night with neon signs and pedestrians",
-                "a camera flying through a futuristic city with flying cars and skyscrapers",
-                "a waterfall freezing and thawing in a seasonal time-lapse",
-                "northern lights dancing across a starry Arctic sky"
-            ],
-            llm: [
-                "Explain quantum entanglement like I'm a curious 10-year-old",
-                "Write a haiku about artificial intelligence",
-                "What would happen if gravity suddenly became twice as strong?",
-                "Create a short story about a time-traveling detective"
-            ],
-            audio2text: [
-                "(Upload or speak: a podcast episode, lecture, or voice note to transcribe)",
-                "(Upload audio: interview, meeting recording, or musical performance to analyze)"
-            ]
-        };
-
-        // Image-based prompts that reference existing images in outputs/
-        const imageBasedPrompts = {
-            img2img: [
-                "transform this image into a watercolor painting with soft, flowing brushstrokes",
-                "convert to a dramatic black and white photograph with high contrast",
-                "reimagine as a vibrant pop art piece with bold colors and comic book styling",
-                "add a mystical fog and fantasy lighting to create an ethereal atmosphere",
-                "transform into a vintage 1920s photograph with sepia tones and grain",
-                "make it look like an oil painting by Van Gogh with swirling, expressive strokes",
-                "add a sunset color palette with warm oranges and purples",
-                "convert to a cyberpunk aesthetic with neon highlights and futuristic elements",
-                "transform into a pencil sketch with delicate shading and fine details",
-                "add dramatic storm clouds and moody lighting"
-            ],
-            img2video: [
-                "create a gentle camera pan across this scene from left to right",
-                "add subtle parallax effect to create depth and dimension",
-                "animate with a slow zoom-in while adding particles or snow falling",
-                "create a cinemagraph where one element moves (water, clouds, or fabric)",
-                "add a gentle breathing effect to make the image feel alive",
-                "create a rotating camera movement around the main subject"
-            ],
-            controlnet: [
-                "create a photorealistic portrait following the pose and structure",
-                "transform the structure into a fantasy landscape with mountains and castles",
-                "convert the structural outline into a futuristic architecture design",
-                "use the edge structure to create an anime-style character illustration"
-            ]
-        };
-
-        // Function to get a random item from an array
-        function getRandomItem(array) {
-            return array[Math.floor(Math.random() * array.length)];
-        }
+    With no clients connected this returns before building anything.
+    """
+    global _last_component, _last_emit_ts, _pending_state, _flush_handle, _last_emit_key
+
+    if not manager.active_connections:
+        return
+
+    now = time.monotonic()
+    key = (
+        component, progress, total, message, api_call,
+        tuple(sorted((metrics or {}).items())),
+        tuple(sorted((component_timing or {}).items())),
+        tuple(sorted((component_percentages or {}).items())),
+    )
+    if key == _last_emit_key and now - _last_emit_ts < _HEARTBEAT_INTERVAL:
+        return
+    _last_emit_key = key
 
-        // Function to set a random creative prompt based on mode
-        function setRandomPrompt(mode) {
-            const promptField = document.getElementById('prompt');
+    state = {
+        "component": component,
+        "progress": progress,
+        "total": total,
+        "message": message,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+    }
+    # Optional fields are omitted when empty (the UI defaults them)
+    if metrics:
+        state["metrics"] = metrics
+    if api_call:
+        state["api_call"] = api_call
+    if component_timing:
+        state["component_timing"] = component_timing
+    if component_percentages:
+        state["component_percentages"] = component_percentages
 
-            // Determine which prompt list to use
-            let promptList;
-            if (mode === 'img2img' || mode === 'img2video' || mode === 'controlnet') {
-                promptList = imageBasedPrompts[mode] || creativePrompts.text2img;
-            } else {
-                promptList = creativePrompts[mode] || creativePrompts.text2img;
-            }
+    must_send = (
+        component != _last_component
+        or component in _TERMINAL_COMPONENTS
+        or (total > 0 and progress >= total)
+        or component_timing
+    )
+    if not must_send and now - _last_emit_ts < _EMIT_INTERVAL:
+        _pending_state = state
+        if _flush_handle is None:
+            _flush_handle = asyncio.get_running_loop().call_later(_EMIT_INTERVAL, _flush_pending_state)
+        return
+
+    # Anything still pending is older than this state
+    _pending_state = None
+    if _flush_handle is not None:
+        _flush_handle.cancel()
+        _flush_handle = None
+
+    _last_component = component
+    _last_emit_ts = now
+    await manager.broadcast(state)
 
-            // Set random prompt
-            const randomPrompt = getRandomItem(promptList);
-            promptField.value = randomPrompt;
-        }
 
-        // Switch generation mode
-        function switchMode(mode) {
-            currentMode = mode;
+def _decode_init_image(data: str) -> Image.Image:
+    """
+    Decode a base64 (optionally data-URI prefixed) reference image.
 
-            // Update mode buttons
-            document.querySelectorAll('.mode-btn').forEach(btn => {
-                btn.classList.toggle('active', btn.dataset.mode === mode);
-            });
+    Only the header is parsed (enough for the size shown in the API call);
+    pixels are decoded lazily if the image is ever used. Blocking: base64
+    decoding of a large upload takes milliseconds, so callers on the event
+    loop run this via asyncio.to_thread.
+    """
+    if data.startswith("data:image"):
+        data = data.split(",", 1)[1]
+    return Image.open(io.BytesIO(base64.b64decode(data)))
 
-            // Update block diagram visualization
-            updateBlockDiagram(mode);
 
-            // Update model insights panel
-            updateModelInsights(mode);
+# Per-step diffusion progress is buffered and sent as one frame per interval
+_STEP_FLUSH_INTERVAL = 0.1
 
-            // Show/hide image upload
-            const imageUpload = document.getElementById('imageUpload');
-            if (mode === 'img2img' || mode === 'controlnet' || mode === 'img2video') {
-                imageUpload.classList.add('visible');
-            } else {
-                imageUpload.classList.remove('visible');
-            }
 
-            // Set random creative prompt for the new mode
-            setRandomPrompt(mode);
+class StepMetricsBuffer:
+    """
+    Collect per-step diffusion timings from the generation thread.
 
-            console.log(`Switched to ${mode} mode`);
-        }
+    record() runs in the executor thread driving the pipeline; the event loop
+    drains the ring every _STEP_FLUSH_INTERVAL and emits a single frame for all
+    steps completed since the previous flush.
+    """
 
-        // Handle image upload
-        function handleImageUpload(event) {
-            const file = event.target.files[0];
-            if (file) {
-                const reader = new FileReader();
-                reader.onload = function(e) {
-                    uploadedImage = e.target.result;
+    __slots__ = ("_ring", "_last_ts")
 
-                    // Show preview
-                    const preview = document.getElementById('uploadPreview');
-                    preview.src = uploadedImage;
-                    preview.style.display = 'block';
+    def __init__(self, maxlen: int = 256):
+        self._ring = deque(maxlen=maxlen)
+        self._last_ts = time.perf_counter()
 
-                    // Hide upload text
-                    document.getElementById('uploadText').style.display = 'none';
+    def record(self, step: int, total: int):
+        """Store (step, seconds since the previous step); deque.append is thread-safe."""
+        now = time.perf_counter()
+        self._ring.append((step, now - self._last_ts))
+        self._last_ts = now
 
-                    // Update upload zone styling
-                    document.getElementById('uploadZone').classList.add('has-image');
+    def drain(self) -> list:
+        """Pop everything recorded so far (safe against concurrent record())."""
+        items = []
+        while self._ring:
+            items.append(self._ring.popleft())
+        return items
 
-                    console.log('Image uploaded successfully');
-                };
-                reader.readAsDataURL(file);
-            }
-        }
 
-        // Update parameter display
-        function updateParamDisplay() {
-            const steps = document.getElementById('steps').value;
-            const guidance = document.getElementById('guidance').value;
-            const seed = document.getElementById('seed').value || 'random';
-            const size = document.getElementById('imageSize').value;
-
-            document.getElementById('param-steps').textContent = steps;
-            document.getElementById('param-guidance').textContent = guidance;
-            document.getElementById('param-seed').textContent = seed;
-            document.getElementById('param-size').textContent = size.replace('x', '×');
-        }
+async def _emit_step_metrics(buffer: StepMetricsBuffer, total_steps: int):
+    """Emit one diffusion progress frame for the steps buffered since the last call."""
+    steps = buffer.drain()
+    if not steps:
+        return
 
-        // Update steps display
-        document.getElementById('steps').addEventListener('input', (e) => {
-            const steps = e.target.value;
-            document.getElementById('stepsValue').textContent = steps;
-            // Sync with Performance Summary
-            document.getElementById('perfSteps').textContent = steps;
-            // Update progress display
-            document.getElementById('progressDisplay').textContent = `0/${steps}`;
-            updateParamDisplay();
-        });
-
-        // Update guidance display
-        document.getElementById('guidance').addEventListener('input', (e) => {
-            document.getElementById('guidanceValue').textContent = e.target.value;
-            updateParamDisplay();
-        });
-
-        // Update size display
-        document.getElementById('imageSize').addEventListener('change', (e) => {
-            // Sync with Performance Summary
-            document.getElementById('perfImageSize').textContent = e.target.value.replace('x', '×');
-            updateParamDisplay();
-        });
-
-        // Update seed display
-        document.getElementById('seed').addEventListener('input', () => {
-            updateParamDisplay();
-        });
-
-        // Connect to WebSocket
-        function connectWebSocket() {
-            const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-            ws = new WebSocket(`${protocol}//${window.location.host}/ws`);
-
-            ws.onopen = () => {
-                console.log('WebSocket connected');
-            };
-
-            ws.onmessage = (event) => {
-                const data = JSON.parse(event.data);
-                updatePipeline(data);
-            };
-
-            ws.onerror = (error) => {
-                console.error('WebSocket error:', error);
-            };
-
-            ws.onclose = () => {
-                console.log('WebSocket disconnected');
-                setTimeout(connectWebSocket, 2000);
-            };
+    step = steps[-1][0]
+    await emit_state(
+        "diffusion", step, total_steps,
+        f"Denoising step {step}/{total_steps}",
+        {
+            "step_times": steps,
+            "time_per_step": sum(elapsed for _, elapsed in steps) / len(steps)
         }
+    )
 
-        function updatePipeline(data) {
-            const { component, progress, total, message, metrics, api_call, component_timing, component_percentages } = data;
 
-            // Update status
-            document.getElementById('status').textContent = message;
-            document.getElementById('status').className = component !== 'idle' ? 'status active' : 'status';
+async def _flush_step_metrics(buffer: StepMetricsBuffer, total_steps: int):
+    """Periodically emit buffered step metrics until cancelled."""
+    while True:
+        await asyncio.sleep(_STEP_FLUSH_INTERVAL)
+        await _emit_step_metrics(buffer, total_steps)
 
-            // Update API call details if present
-            if (api_call) {
-                const apiDisplay = document.getElementById('apiCallDetails');
-                apiDisplay.innerHTML = `<pre style="margin: 0; white-space: pre-wrap; color: #c9d1d9;">${escapeHtml(api_call)}</pre>`;
-            }
 
-            // Handle component timing updates
-            if (component_timing) {
-                updateComponentTiming(component_timing.component, component_timing.elapsed_time);
-            }
+class GenerateRequest(BaseModel):
+    # Unknown fields are dropped and defaults trusted as-is (no re-validation)
+    model_config = ConfigDict(extra="ignore", validate_default=False, str_strip_whitespace=True)
 
-            // Handle final percentage calculations
-            if (component_percentages) {
-                updateComponentPercentages(component_percentages);
-            }
+    prompt: str
+    mode: Optional[str] = "text2img"  # text2img, img2img, controlnet
+    num_inference_steps: Optional[int] = 30
+    guidance_scale: Optional[float] = 7.5
+    width: Optional[int] = 1024
+    height: Optional[int] = 1024
+    seed: Optional[int] = None
+    init_image: Optional[str] = None  # Base64 encoded image for img2img/controlnet
+    strength: Optional[float] = 0.8  # For img2img: how much to transform (0-1)
 
-            // Update components
-            document.querySelectorAll('.component').forEach(comp => {
-                comp.classList.remove('active');
-                const compName = comp.dataset.component;
-
-                if (compName === component) {
-                    comp.classList.add('active');
-                    const progressBar = comp.querySelector('.progress-bar');
-                    if (progressBar) {
-                        if (total > 0) {
-                            const percent = (progress / total) * 100;
-                            progressBar.style.width = percent + '%';
-                        } else {
-                            progressBar.style.width = '100%';
-                        }
-                    }
-                }
-            });
-
-            // Update arrows based on active component
-            const componentOrder = ['input', 'api', 'loading', 'encoding', 'diffusion', 'saving', 'complete'];
-            const currentIndex = componentOrder.indexOf(component);
-
-            document.querySelectorAll('.h-arrow').forEach((arrow, idx) => {
-                if (idx < currentIndex) {
-                    arrow.classList.add('active');
-                } else {
-                    arrow.classList.remove('active');
-                }
-            });
-
-            // Update corner connector
-            const cornerConnector = document.querySelector('.corner-connector');
-            if (cornerConnector) {
-                if (currentIndex >= 4) { // After encoding, show active
-                    cornerConnector.style.background = 'linear-gradient(180deg, #66bb6a, #4a8f4e)';
-                    cornerConnector.style.boxShadow = '0 0 8px rgba(102, 187, 106, 0.6)';
-                } else {
-                    cornerConnector.style.background = 'linear-gradient(180deg, #4fc3f7, #3a5f7f)';
-                    cornerConnector.style.boxShadow = '0 0 6px rgba(79, 195, 247, 0.4)';
-                }
-            }
 
-            // Update metrics
-            if (total > 0) {
-                document.getElementById('progressDisplay').textContent = `${progress}/${total}`;
-
-                // Calculate estimated remaining time
-                if (metrics.time_per_step && progress > 0) {
-                    const remaining = (total - progress) * metrics.time_per_step;
-                    if (remaining > 60) {
-                        document.getElementById('estRemaining').textContent = `${Math.floor(remaining / 60)}m ${Math.floor(remaining % 60)}s`;
-                    } else {
-                        document.getElementById('estRemaining').textContent = `${Math.floor(remaining)}s`;
-                    }
-                }
-            }
+@app.on_event("startup")
+async def warmup_generator():
+    """
+    Pre-load the model and run a one-step dummy generation at startup.
 
-            if (metrics.elapsed_time) {
-                document.getElementById('elapsedTime').textContent = metrics.elapsed_time.toFixed(1) + 's';
-            }
-            if (metrics.time_per_step) {
-                document.getElementById('timePerStep').textContent = metrics.time_per_step.toFixed(2) + 's';
-            }
+    Same opt-in as the REST server (WARMUP_AT_STARTUP=1). Uvicorn accepts no
+    connections until startup hooks finish, so the page and /generate become
+    available only once the warmup completes. It runs on the generation
+    executor like every later generation.
+    """
+    global _generator
+    if os.environ.get("WARMUP_AT_STARTUP") != "1":
+        return
 
-            // Mark completed components
-            if (component === 'complete') {
-                generating = false;
-                document.getElementById('generateBtn').disabled = false;
-                document.querySelectorAll('.component').forEach(comp => {
-                    comp.classList.add('completed');
-                    const progressBar = comp.querySelector('.progress-bar');
-                    if (progressBar) {
-                        progressBar.style.width = '100%';
-                    }
-                });
-            }
-        }
+    logger.info("Warming up generator (WARMUP_AT_STARTUP=1)...")
+    if _generator is None:
+        _generator = ImageGenerator(auto_preview=False)
+    try:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            _GEN_EXECUTOR,
+            partial(_generator.generate, "warmup prompt", num_inference_steps=1, auto_save=False)
+        )
+        logger.info("✓ Generator warmed up")
+    except Exception as e:
+        logger.warning(f"Warmup failed, first request will load the model: {e}")
 
-        // Update component timing display
-        function updateComponentTiming(componentName, elapsedTime) {
-            const components = document.querySelectorAll(`[data-component="${componentName}"]`);
-            components.forEach(comp => {
-                const timingDiv = comp.querySelector('.component-timing');
-                if (timingDiv) {
-                    timingDiv.textContent = `${elapsedTime.toFixed(2)}s`;
-                }
-            });
-        }
 
-        // Update component percentages after generation completes
-        function updateComponentPercentages(percentages) {
-            for (const [componentName, percentage] of Object.entries(percentages)) {
-                const components = document.querySelectorAll(`[data-component="${componentName}"]`);
-                components.forEach(comp => {
-                    const percentDiv = comp.querySelector('.component-percentage');
-                    if (percentDiv) {
-                        percentDiv.textContent = `${percentage.toFixed(1)}%`;
-                        percentDiv.classList.add('visible');
-                    }
-                });
-            }
-        }
+@app.get("/", include_in_schema=False)
+@app.get("/index.html", include_in_schema=False)
+async def get_interface(request: Request):
+    """Serve the visualization interface from pre-encoded bytes."""
+    # /index.html is routed here too: the raw file on disk still carries the
+    # __APP_JS_VERSION__ placeholder, which would pin a stale cached app.js
+    # Revalidate on every load: a restart with new HTML is picked up at once,
+    # while unchanged pages cost only a 304
+    return _INTERFACE.response(request, "no-cache")
 
-        // Timeline function removed - using Pipeline Stage Breakdown instead
-
-        // Handle form submission
-        document.getElementById('generateForm').addEventListener('submit', async (e) => {
-            e.preventDefault();
-
-            if (generating) return;
-
-            generating = true;
-            startTime = Date.now();
-            document.getElementById('generateBtn').disabled = true;
-
-            // Reset pipeline
-            document.querySelectorAll('.component').forEach(comp => {
-                comp.classList.remove('active', 'completed');
-                const progressBar = comp.querySelector('.progress-bar');
-                if (progressBar) {
-                    progressBar.style.width = '0%';
-                }
-                // Clear timing and percentage displays
-                const timingDiv = comp.querySelector('.component-timing');
-                const percentDiv = comp.querySelector('.component-percentage');
-                if (timingDiv) timingDiv.textContent = '';
-                if (percentDiv) {
-                    percentDiv.textContent = '';
-                    percentDiv.classList.remove('visible');
-                }
-            });
-
-            // Reset arrows
-            document.querySelectorAll('.h-arrow').forEach(arrow => {
-                arrow.classList.remove('active');
-            });
-
-            // Reset corner connector
-            const cornerConnector = document.querySelector('.corner-connector');
-            if (cornerConnector) {
-                cornerConnector.style.background = 'linear-gradient(180deg, #4fc3f7, #3a5f7f)';
-                cornerConnector.style.boxShadow = '0 0 6px rgba(79, 195, 247, 0.4)';
-            }
 
-            const prompt = document.getElementById('prompt').value;
-            const steps = parseInt(document.getElementById('steps').value);
-            const guidance = parseFloat(document.getElementById('guidance').value);
-            const seed = document.getElementById('seed').value;
-            const sizeValue = document.getElementById('imageSize').value;
-            const [width, height] = sizeValue.split('x').map(v => parseInt(v));
-
-            try {
-                const response = await fetch('/generate', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        prompt,
-                        mode: currentMode,
-                        num_inference_steps: steps,
-                        guidance_scale: guidance,
-                        width: width,
-                        height: height,
-                        seed: seed ? parseInt(seed) : null,
-                        init_image: uploadedImage  // Base64 encoded image
-                    })
-                });
-
-                const result = await response.json();
-
-                if (result.success) {
-                    // Display model output based on mode
-                    const outputDisplay = document.getElementById('outputDisplay');
-
-                    if (currentMode === 'text2img' || currentMode === 'img2img' || currentMode === 'controlnet') {
-                        outputDisplay.innerHTML = `<img src="/image/${result.filename}" alt="Generated image">`;
-                    } else if (currentMode === 'text2video' || currentMode === 'img2video') {
-                        outputDisplay.innerHTML = `<video controls><source src="/video/${result.filename}" type="video/mp4"></video>`;
-                    } else if (currentMode === 'text2audio') {
-                        outputDisplay.innerHTML = `<audio controls><source src="/audio/${result.filename}" type="audio/mpeg"></audio>`;
-                    } else if (currentMode === 'audio2text' || currentMode === 'llm') {
-                        outputDisplay.innerHTML = `<pre>${result.text || result.content}</pre>`;
-                    }
-                } else {
-                    console.error('Generation failed:', result.error);
-                }
-            } catch (error) {
-                console.error('Generation error:', error);
-                generating = false;
-                document.getElementById('generateBtn').disabled = false;
-            }
-        });
-
-        // Initialize
-        connectWebSocket();
-        updateModelInsights('text2img'); // Initialize with default mode
-        updateParamDisplay(); // Initialize parameter display
-        setRandomPrompt('text2img'); // Set initial random prompt
-    </script>
-</body>
-</html>
-    """
-    return HTMLResponse(content=html_content)
+@app.get("/app.js", include_in_schema=False)
+async def get_app_js(request: Request):
+    """Serve the UI script; its URL carries a content hash, so cache it for good."""
+    return _APP_JS.response(request, "public, max-age=31536000, immutable")
 
 
 @app.websocket("/ws")
@@ -2544,6 +548,26 @@ async def websocket_endpoint(websocket: WebSocket):
         manager.disconnect(websocket)
 
 
+@lru_cache(maxsize=1)
+def _output_dir() -> Path:
+    """Output directory from the shared (read-only) config, resolved once."""
+    return Path(get_config().output["directory"])
+
+
+def _generate_and_locate(generator: ImageGenerator, **kwargs):
+    """
+    Generate an image and return it with the path it was saved to.
+
+    Runs on the generation executor; the path is read in the same job so a
+    queued request cannot overwrite ``last_saved_path`` in between.
+
+    Returns:
+        Tuple of (PIL Image, saved Path or None)
+    """
+    image = generator.generate(**kwargs)
+    return image, generator.last_saved_path
+
+
 @app.post("/generate")
 async def generate(request: GenerateRequest):
     """Generate image with real-time pipeline visualization."""
@@ -2577,71 +601,52 @@ async def generate(request: GenerateRequest):
             mode_note = "\n   ⚠️  WARNING: No reference image provided, falling back to text2img"
             mode = "text2img"  # Fallback
         elif mode in ["img2img", "controlnet"] and has_init_image:
-            mode_note = "\n   ✓ Reference image received (base64 encoded)"
-
-        api_call_details = f"""📋 GENERATION PARAMETERS:
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-🔹 MODE:
-   • {mode_desc}{mode_note}
-
-🔹 PROMPT (Positive):
-   "{request.prompt}"
-
-🔹 NEGATIVE PROMPT:
-   "{negative_prompt if negative_prompt else '(none)'}"
-
-🔹 MODEL CONFIGURATION:
-   • Model ID: {model_config['model_id']}
-   • Variant: fp16 (half precision)
-   • Device: {_generator.device if _generator else 'will auto-detect (CPU/MPS/CUDA)'}
-   • Model Type: Stable Diffusion XL
-
-🔹 GENERATION PARAMETERS:
-   • Width: {request.width} px
-   • Height: {request.height} px
-   • Inference Steps: {request.num_inference_steps or 30}
-   • Guidance Scale: {guidance_scale} (how strongly to follow prompt)
-   • Seed: {request.seed if request.seed else 'random (non-deterministic)'}
-   • Scheduler: {model_config.get('scheduler', 'EulerDiscreteScheduler')}
-
-🔹 INTERNAL PROCESSING:
-   • Latent Size: [{request.height//8} x {request.width//8}] (VAE compresses 8x)
-   • Latent Channels: 4 (SDXL latent space dimensionality)
-   • Text Encoder: CLIP (2 encoders for SDXL)
-   • Cross-Attention: Text embeddings guide image latents
-   • Self-Attention: Ensures spatial coherency in image
-   • Total UNet Parameters: ~2.6 billion
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"""
-
-        # Step 1: Input
+            # Decode off the event loop so websocket emits aren't stalled
+            try:
+                init_image = await asyncio.to_thread(_decode_init_image, request.init_image)
+                mode_note = f"\n   ✓ Reference image received ({init_image.width}x{init_image.height})"
+            except (binascii.Error, ValueError, UnidentifiedImageError) as e:
+                mode_note = f"\n   ⚠️  WARNING: Could not decode reference image ({e}), falling back to text2img"
+                mode = "text2img"  # Fallback
+
+        api_call_details = _API_CALL_TEMPLATE % {
+            "mode_desc": mode_desc,
+            "mode_note": mode_note,
+            "prompt": request.prompt,
+            "negative_prompt": negative_prompt if negative_prompt else '(none)',
+            "model_id": model_config['model_id'],
+            "device": _generator.device if _generator else 'will auto-detect (CPU/MPS/CUDA)',
+            "width": request.width,
+            "height": request.height,
+            "steps": request.num_inference_steps or 30,
+            "guidance_scale": guidance_scale,
+            "seed": request.seed if request.seed else 'random (non-deterministic)',
+            "scheduler": model_config.get('scheduler', 'EulerDiscreteScheduler'),
+            "latent_height": request.height // 8,
+            "latent_width": request.width // 8,
+        }
+
+        # Step 1: Input (the small state frame first so the UI switches stage
+        # at once; the long parameter listing follows as its own message)
         timing_tracker.start_component("start")
-        await emit_state(
-            "input", 0, 0,
-            f"Received: {request.prompt[:50]}...",
-            api_call=api_call_details
-        )
-        await asyncio.sleep(0.3)
+        await emit_state("input", 0, 0, f"Received: {request.prompt[:50]}...")
+        await manager.broadcast({"api_call": api_call_details})
         input_time = timing_tracker.end_component("start")
         await emit_state(
             "input", 1, 1,
             "✓ Step 1 COMPLETE: Input received",
             component_timing={"component": "start", "elapsed_time": input_time}
         )
-        await asyncio.sleep(0.2)
 
         # Step 2: API Processing
         timing_tracker.start_component("api")
         await emit_state("api", 0, 0, "Processing request parameters")
-        await asyncio.sleep(0.3)
         api_time = timing_tracker.end_component("api")
         await emit_state(
             "api", 1, 1,
             "✓ Step 2 COMPLETE: Request processed",
             component_timing={"component": "api", "elapsed_time": api_time}
         )
-        await asyncio.sleep(0.2)
 
         # Step 3: Model Loading
         timing_tracker.start_component("text-encode")  # Model loading maps to text-encode component
@@ -2650,8 +655,6 @@ async def generate(request: GenerateRequest):
             _generator = ImageGenerator(auto_preview=False)
         load_time = timing_tracker.end_component("text-encode")
 
-        # Calculate model size and loading speed (config already imported at module level)
-
         # Estimate model size (SDXL is typically ~13GB for full precision, ~6.5GB for fp16)
         model_size_gb = 6.5  # fp16 variant
         load_speed = model_size_gb / load_time if load_time > 0 else 0
@@ -2662,12 +665,10 @@ async def generate(request: GenerateRequest):
             f"✓ Step 3 COMPLETE: Model loaded in {load_time:.2f}s (~{model_size_gb}GB @ {load_speed:.2f}GB/s on {device})",
             component_timing={"component": "text-encode", "elapsed_time": load_time}
         )
-        await asyncio.sleep(0.2)
 
         # Step 4: Text Encoding
         timing_tracker.start_component("text-embed")
         await emit_state("encoding", 0, 0, "Encoding text prompt...")
-        await asyncio.sleep(0.3)
         encode_time = timing_tracker.end_component("text-embed")
         token_count = len(request.prompt.split())  # Rough estimate
         await emit_state(
@@ -2675,30 +676,36 @@ async def generate(request: GenerateRequest):
             f"✓ Step 4 COMPLETE: {token_count} tokens encoded in {encode_time:.3f}s",
             component_timing={"component": "text-embed", "elapsed_time": encode_time}
         )
-        await asyncio.sleep(0.2)
 
         # Step 5: Diffusion (with progress updates)
         total_steps = request.num_inference_steps or 30
 
-        # We'll simulate step-by-step progress
-        # In reality, we'd hook into the diffusion process
         timing_tracker.start_component("diffusion")
         await emit_state("diffusion", 0, total_steps, "Starting diffusion process...")
 
-        # Generate the image
-        # Note: This is blocking - in a real implementation, we'd need async progress callbacks
-        loop = asyncio.get_event_loop()
-        image = await loop.run_in_executor(
-            None,
-            lambda: _generator.generate(
-                prompt=request.prompt,
-                width=request.width,
-                height=request.height,
-                num_inference_steps=total_steps,
-                seed=request.seed,
-                auto_save=True
+        # Generate the image in a worker thread; per-step progress is buffered
+        # there and flushed to clients in batches from the event loop
+        step_metrics = StepMetricsBuffer()
+        flusher = asyncio.create_task(_flush_step_metrics(step_metrics, total_steps))
+        loop = asyncio.get_running_loop()
+        try:
+            image, image_path = await loop.run_in_executor(
+                _GEN_EXECUTOR,
+                partial(
+                    _generate_and_locate,
+                    _generator,
+                    prompt=request.prompt,
+                    width=request.width,
+                    height=request.height,
+                    num_inference_steps=total_steps,
+                    seed=request.seed,
+                    auto_save=True,
+                    step_callback=step_metrics.record
+                )
             )
-        )
+        finally:
+            flusher.cancel()
+        await _emit_step_metrics(step_metrics, total_steps)
 
         diffusion_time = timing_tracker.end_component("diffusion")
         steps_per_sec = total_steps / diffusion_time if diffusion_time > 0 else 0
@@ -2708,7 +715,6 @@ async def generate(request: GenerateRequest):
             f"✓ Step 5 COMPLETE: {total_steps} denoising steps @ {steps_per_sec:.2f} steps/s ({diffusion_time:.2f}s total)",
             component_timing={"component": "diffusion", "elapsed_time": diffusion_time}
         )
-        await asyncio.sleep(0.2)
 
         elapsed = time.time() - start_time
 
@@ -2716,17 +722,11 @@ async def generate(request: GenerateRequest):
         timing_tracker.start_component("vae-decode")
         await emit_state("saving", 0, 0, "Decoding latents and saving image...")
 
-        # Find the generated file
-        config = get_config()
-        output_dir = Path(config.output["directory"])
-        files = sorted(output_dir.glob("*.png"), key=lambda p: p.stat().st_mtime, reverse=True)
-
-        if files:
-            image_path = files[0]
-            filename = image_path.name
-            file_size_mb = image_path.stat().st_size / (1024 * 1024)
-        else:
+        # The generator reports the file it wrote; no need to scan output_dir
+        if image_path is None:
             raise RuntimeError("Image file not found")
+        filename = image_path.name
+        file_size_mb = (await loop.run_in_executor(None, image_path.stat)).st_size / (1024 * 1024)
 
         save_time = timing_tracker.end_component("vae-decode")
         await emit_state(
@@ -2734,7 +734,6 @@ async def generate(request: GenerateRequest):
             f"✓ Step 6 COMPLETE: Image saved ({file_size_mb:.2f}MB) in {save_time:.3f}s",
             component_timing={"component": "vae-decode", "elapsed_time": save_time}
         )
-        await asyncio.sleep(0.2)
 
         # Step 7: Complete
         timing_tracker.start_component("output-complete")
@@ -2772,16 +771,40 @@ async def generate(request: GenerateRequest):
 
 
 @app.get("/image/{filename}")
-async def get_image(filename: str):
+async def get_image(filename: str, request: Request):
     """Serve generated images."""
-    config = get_config()
-    output_dir = Path(config.output["directory"])
-    image_path = output_dir / filename
+    # Only plain file names inside the output directory ("." and ".." pass
+    # the name check but resolve to directories)
+    if Path(filename).name != filename or filename in (".", ".."):
+        raise HTTPException(status_code=404, detail="Image not found")
 
-    if image_path.exists():
-        return FileResponse(image_path)
-    else:
-        return {"error": "Image not found"}
+    image_path = _output_dir() / filename
+    try:
+        stat_result = await asyncio.to_thread(image_path.stat)
+    except OSError:
+        raise HTTPException(status_code=404, detail="Image not found")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    # Names are reused once an output is deleted, so always revalidate; an
+    # unchanged file then costs a 304 instead of the whole PNG
+    etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(image_path, stat_result=stat_result, headers=headers)
+
+
+# Serve any other static assets last so API routes (and the cached page and
+# script) take precedence; StaticFiles handles ETag/Last-Modified and answers
+# conditional requests with 304. Gzip is scoped to this mount so PNGs and JSON
+# from the API routes are never recompressed.
+app.mount(
+    "/",
+    GZipMiddleware(StaticFiles(directory=STATIC_DIR, html=True), minimum_size=1024),
+    name="static"
+)
 
 
 def run_visualization_server(host: str = "0.0.0.0", port: int = 8080):
@@ -2793,7 +816,13 @@ def run_visualization_server(host: str = "0.0.0.0", port: int = 8080):
     print(f"Open your browser to: http://localhost:{port}")
     print(f"Press Ctrl+C to stop\n")
 
-    uvicorn.run(app, host=host, port=port)
+    # uvloop/httptools come with uvicorn[standard] (not on Windows); they give
+    # noticeably faster websocket writes for the broadcast path
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    logger.info(f"Event loop: {loop}, HTTP parser: {http}")
+
+    uvicorn.run(app, host=host, port=port, loop=loop, http=http)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+"""
+Shared helpers for the generation test scripts.
+
+Imported by test_generator.py and test_progressive_visualization.py, both
+when run directly and when collected by pytest.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import torch
+
+# PNG encoding runs on background threads so it overlaps the next
+# generation; test outputs favour fast zlib over small files
+_IO = ThreadPoolExecutor(max_workers=4, thread_name_prefix="png")
+
+
+def save_png(image, path: Path) -> Future:
+    """
+    Queue ``image`` to be written to ``path``.
+
+    Returns the save's future; call ``.result()`` on it before the test
+    returns so write errors fail the test.
+    """
+    return _IO.submit(image.save, path, compress_level=1)
+
+
+def enable_tf32() -> None:
+    """
+    Allow TF32 for CUDA matmuls and cuDNN convolutions.
+
+    Speeds up the fp32 work left on Ampere+ GPUs (the SDXL VAE decodes
+    upcast to fp32); no effect on MPS or CPU. Tests opt in right before
+    loading a generator, so merely collecting this module leaves global
+    torch state alone.
+    """
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
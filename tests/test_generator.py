@@ -4,6 +4,7 @@ Purpose: Comprehensive tests for image generation functionality
 Author: Generated for ImageGeneratorLLM
 """
 
+import os
 import sys
 from pathlib import Path
 import time
@@ -14,31 +15,77 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from image_gen.models.flux import FluxGenerator
 from image_gen.config import get_config
 
+from _util import enable_tf32, save_png
+
+# Loading the pipeline dominates the suite's runtime, so every test shares
+# one generator instead of reloading the weights
+_GEN = None
+
+# IMAGE_GEN_TEST_COMPILE=1 runs the suite with a torch.compile'd denoiser
+# (most tests use the default size, so they share one compiled graph)
+_COMPILE = os.environ.get("IMAGE_GEN_TEST_COMPILE") == "1"
+
+# IMAGE_GEN_TEST_FAST=1 enables step caching (First Block Cache / DeepCache);
+# the suite checks sizes, counts and seeding, which caching doesn't change
+_FAST = os.environ.get("IMAGE_GEN_TEST_FAST") == "1"
+
+# Steps for tests that only check size, count or seeding; output quality is
+# irrelevant there, so a handful of steps is enough (override with CI_STEPS)
+_STEPS = int(os.environ.get("CI_STEPS", 4))
+
+# Where the tests write their PNGs (config is a singleton, resolve it once)
+_OUT_DIR = Path(get_config().output["directory"])
+
+# The size, seed and batch checks assert on the in-memory images, so their
+# PNGs are only written when someone can look at them: interactive runs,
+# --save, or IMAGE_GEN_TEST_SAVE=1 (the quality comparison always saves)
+_SAVE = (
+    "--save" in sys.argv
+    or os.environ.get("IMAGE_GEN_TEST_SAVE") == "1"
+    or sys.stdout.isatty()
+)
+
+
+def _get_gen() -> FluxGenerator:
+    """Return the suite-wide FluxGenerator, loading it on first use."""
+    global _GEN
+    if _GEN is None:
+        # Both seeded runs use the same TF32 math, so reproducibility holds
+        enable_tf32()
+        _GEN = FluxGenerator(compile_model=_COMPILE)
+        if _FAST:
+            _GEN.enable_step_cache()
+        if _COMPILE:
+            # Compile outside the timed sections so elapsed times are steady-state
+            _GEN.generate("warmup", num_inference_steps=_STEPS)
+    return _GEN
+
 
 def test_basic_generation():
-    """Test basic image generation with default parameters."""
+    """Test basic image generation with default size."""
     print("\n" + "="*60)
     print("TEST 1: Basic Image Generation")
     print("="*60)
 
-    gen = FluxGenerator()
+    gen = _get_gen()
 
     prompt = "a serene mountain landscape at sunset"
     print(f"\nPrompt: {prompt}")
 
-    start = time.time()
-    image = gen.generate(prompt)
-    elapsed = time.time() - start
-
-    output_path = Path(get_config().output["directory"]) / "test_landscape.png"
-    image.save(output_path)
+    start = time.perf_counter()
+    image = gen.generate(prompt, num_inference_steps=_STEPS)
+    elapsed = time.perf_counter() - start
 
     print(f"✓ Generated in {elapsed:.1f}s")
     print(f"✓ Size: {image.size}")
-    print(f"✓ Saved to: {output_path}")
 
     assert image.size == (1024, 1024), f"Expected (1024, 1024), got {image.size}"
-    assert output_path.exists(), f"Output file not created"
+
+    if _SAVE:
+        output_path = _OUT_DIR / "test_landscape.png"
+        save_png(image, output_path).result()
+        print(f"✓ Saved to: {output_path}")
+        assert output_path.exists(), f"Output file not created"
 
     return True
 
@@ -49,23 +96,24 @@ def test_custom_size():
     print("TEST 2: Custom Size Generation")
     print("="*60)
 
-    gen = FluxGenerator()
+    gen = _get_gen()
 
     prompt = "a futuristic city at night, cyberpunk style"
     width, height = 768, 768
     print(f"\nPrompt: {prompt}")
     print(f"Size: {width}x{height}")
 
-    start = time.time()
-    image = gen.generate(prompt, width=width, height=height, num_inference_steps=20)
-    elapsed = time.time() - start
-
-    output_path = Path(get_config().output["directory"]) / "test_cyberpunk.png"
-    image.save(output_path)
+    start = time.perf_counter()
+    image = gen.generate(prompt, width=width, height=height, num_inference_steps=_STEPS)
+    elapsed = time.perf_counter() - start
 
     print(f"✓ Generated in {elapsed:.1f}s")
     print(f"✓ Size: {image.size}")
-    print(f"✓ Saved to: {output_path}")
+
+    if _SAVE:
+        output_path = _OUT_DIR / "test_cyberpunk.png"
+        save_png(image, output_path).result()
+        print(f"✓ Saved to: {output_path}")
 
     assert image.size == (width, height), f"Expected ({width}, {height}), got {image.size}"
 
@@ -78,7 +126,7 @@ def test_reproducibility():
     print("TEST 3: Reproducibility with Seed")
     print("="*60)
 
-    gen = FluxGenerator()
+    gen = _get_gen()
 
     prompt = "a cute robot reading a book"
     seed = 42
@@ -87,39 +135,42 @@ def test_reproducibility():
 
     # Generate first image
     print("\nGenerating image 1...")
-    start = time.time()
-    image1 = gen.generate(prompt, seed=seed, num_inference_steps=10)
-    elapsed1 = time.time() - start
+    start = time.perf_counter()
+    image1 = gen.generate(prompt, seed=seed, num_inference_steps=_STEPS)
+    elapsed1 = time.perf_counter() - start
 
     # Generate second image with same seed
     print("Generating image 2 with same seed...")
-    start = time.time()
-    image2 = gen.generate(prompt, seed=seed, num_inference_steps=10)
-    elapsed2 = time.time() - start
-
-    output_path1 = Path(get_config().output["directory"]) / "test_seed1.png"
-    output_path2 = Path(get_config().output["directory"]) / "test_seed2.png"
-
-    image1.save(output_path1)
-    image2.save(output_path2)
+    start = time.perf_counter()
+    image2 = gen.generate(prompt, seed=seed, num_inference_steps=_STEPS)
+    elapsed2 = time.perf_counter() - start
 
     print(f"✓ Image 1 generated in {elapsed1:.1f}s")
     print(f"✓ Image 2 generated in {elapsed2:.1f}s")
-    print(f"✓ Saved to: {output_path1} and {output_path2}")
 
-    # Compare pixels (should be identical)
-    import numpy as np
-    arr1 = np.array(image1)
-    arr2 = np.array(image2)
+    saves = []
+    if _SAVE:
+        output_path1 = _OUT_DIR / "test_seed1.png"
+        output_path2 = _OUT_DIR / "test_seed2.png"
+        saves = [save_png(image1, output_path1), save_png(image2, output_path2)]
 
-    are_identical = np.array_equal(arr1, arr2)
+    # Compare pixels (should be identical); raw bytes compare without copies
+    are_identical = image1.size == image2.size and image1.tobytes() == image2.tobytes()
 
     if are_identical:
         print("✓ Images are pixel-perfect identical (good!)")
     else:
-        diff_percentage = (np.sum(arr1 != arr2) / arr1.size) * 100
+        import numpy as np
+        arr1 = np.asarray(image1)
+        arr2 = np.asarray(image2)
+        diff_percentage = (np.count_nonzero(arr1 != arr2) / arr1.size) * 100
         print(f"⚠ Images differ by {diff_percentage:.2f}% (MPS non-determinism)")
 
+    if saves:
+        for saved in saves:
+            saved.result()
+        print(f"✓ Saved to: {output_path1} and {output_path2}")
+
     return True
 
 
@@ -129,7 +180,7 @@ def test_batch_generation():
     print("TEST 4: Batch Generation")
     print("="*60)
 
-    gen = FluxGenerator()
+    gen = _get_gen()
 
     prompts = [
         "a red apple on a wooden table",
@@ -141,55 +192,82 @@ def test_batch_generation():
     for i, p in enumerate(prompts, 1):
         print(f"  {i}. {p}")
 
-    start = time.time()
-    images = gen.generate_batch(prompts, num_inference_steps=15)
-    elapsed = time.time() - start
+    start = time.perf_counter()
+    images = gen.generate_batch(prompts, num_inference_steps=_STEPS, batch_size=len(prompts))
+    elapsed = time.perf_counter() - start
 
     print(f"\n✓ Generated {len(images)} images in {elapsed:.1f}s")
     print(f"✓ Average: {elapsed/len(images):.1f}s per image")
 
     # Save all images
-    output_dir = Path(get_config().output["directory"])
-    for i, (image, prompt) in enumerate(zip(images, prompts), 1):
-        # Create safe filename from prompt
-        safe_name = "".join(c for c in prompt[:30] if c.isalnum() or c in (' ', '-', '_')).strip()
-        safe_name = safe_name.replace(' ', '_')
-        output_path = output_dir / f"test_batch_{i}_{safe_name}.png"
-        image.save(output_path)
-        print(f"  ✓ Saved: {output_path.name}")
+    if _SAVE:
+        saves = []
+        for i, (image, prompt) in enumerate(zip(images, prompts), 1):
+            # Create safe filename from prompt
+            safe_name = "".join(c for c in prompt[:30] if c.isalnum() or c in (' ', '-', '_')).strip()
+            safe_name = safe_name.replace(' ', '_')
+            output_path = _OUT_DIR / f"test_batch_{i}_{safe_name}.png"
+            saves.append((output_path, save_png(image, output_path)))
+        for output_path, saved in saves:
+            saved.result()
+            print(f"  ✓ Saved: {output_path.name}")
 
     assert len(images) == len(prompts), f"Expected {len(prompts)} images, got {len(images)}"
 
     return True
 
 
+def test_batch_invalid_size():
+    """Test that batched generation rejects sizes that aren't multiples of 8."""
+    print("\n" + "="*60)
+    print("TEST 5: Batch Size Validation")
+    print("="*60)
+
+    gen = _get_gen()
+
+    prompts = ["a red apple on a wooden table", "a blue ocean wave"]
+    print(f"\nGenerating {len(prompts)} images at 1024x1001 with batch_size=2...")
+
+    try:
+        gen.generate_batch(prompts, width=1001, num_inference_steps=_STEPS, batch_size=2)
+    except ValueError as e:
+        print(f"✓ Rejected with ValueError: {e}")
+    else:
+        raise AssertionError("Expected ValueError for width=1001")
+
+    return True
+
+
 def test_quality_steps():
     """Test effect of different step counts on quality."""
     print("\n" + "="*60)
-    print("TEST 5: Quality vs Speed Trade-off")
+    print("TEST 6: Quality vs Speed Trade-off")
     print("="*60)
 
-    gen = FluxGenerator()
+    gen = _get_gen()
 
     prompt = "a detailed portrait of a wise old wizard"
-    step_counts = [10, 20, 30]
+    step_counts = [4, 6, 8]
 
     print(f"\nPrompt: {prompt}")
     print(f"Testing steps: {step_counts}")
 
-    output_dir = Path(get_config().output["directory"])
-
+    # Each PNG is written while the next step count generates
+    saves = []
     for steps in step_counts:
         print(f"\n  Generating with {steps} steps...")
-        start = time.time()
+        start = time.perf_counter()
         image = gen.generate(prompt, num_inference_steps=steps, seed=123)
-        elapsed = time.time() - start
+        elapsed = time.perf_counter() - start
 
-        output_path = output_dir / f"test_quality_{steps}steps.png"
-        image.save(output_path)
+        output_path = _OUT_DIR / f"test_quality_{steps}steps.png"
+        saves.append((output_path, save_png(image, output_path)))
 
         print(f"    ✓ Time: {elapsed:.1f}s")
-        print(f"    ✓ Saved: {output_path.name}")
+
+    for output_path, saved in saves:
+        saved.result()
+        print(f"  ✓ Saved: {output_path.name}")
 
     print(f"\n✓ Compare images in outputs/ to see quality differences")
 
@@ -207,6 +285,7 @@ def run_all_tests():
         ("Custom Size", test_custom_size),
         ("Reproducibility", test_reproducibility),
         ("Batch Generation", test_batch_generation),
+        ("Batch Size Validation", test_batch_invalid_size),
         ("Quality Steps", test_quality_steps),
     ]
 
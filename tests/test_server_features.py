@@ -9,27 +9,46 @@ This verifies:
 """
 
 import sys
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 import re
+import html
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+STATIC_DIR = Path(__file__).parent.parent / "image_gen" / "static"
+
+# Keys of array-valued entries in JS object literals ("key": [ or key: [)
+PROMPT_KEY_RE = re.compile(r'["\']?\b(\w+)["\']?:\s*\[')
+
+# Pipeline component tooltip titles (HTML-escaped attribute values)
+TOOLTIP_TITLE_RE = re.compile(r'data-tooltip-title="([^"]*)"')
+
+# switchMode() must reseed the prompt for the newly selected mode
+SWITCH_MODE_RE = re.compile(r"function switchMode[\s\S]*?setRandomPrompt\(mode\)")
+
+
+@lru_cache(maxsize=None)
+def _read_static(name: str) -> Optional[str]:
+    """Read a UI file once for all tests (None if it doesn't exist)."""
+    path = STATIC_DIR / name
+    return path.read_text() if path.exists() else None
+
 
 def test_random_prompts_exist():
-    """Test that random prompt arrays are defined in visualization server."""
+    """Test that random prompt arrays are defined in the visualization interface."""
     print("\n" + "="*70)
     print("TEST: Random Creative Prompts Exist")
     print("="*70)
 
-    server_file = Path(__file__).parent.parent / "image_gen" / "visualization_server.py"
+    content = _read_static("app.js")
 
-    if not server_file.exists():
-        print(f"✗ Server file not found: {server_file}")
+    if content is None:
+        print(f"✗ Script file not found: {STATIC_DIR / 'app.js'}")
         return False
 
-    content = server_file.read_text()
-
     # Check for creative prompts object
     if "const creativePrompts = {" not in content:
         print("✗ creativePrompts object not found")
@@ -37,6 +56,9 @@ def test_random_prompts_exist():
 
     print("✓ creativePrompts object found")
 
+    # Every prompt-list key, from one scan of the script
+    prompt_keys = set(PROMPT_KEY_RE.findall(content))
+
     # Check for each modality
     modalities = [
         "text2img",
@@ -47,9 +69,7 @@ def test_random_prompts_exist():
     ]
 
     for modality in modalities:
-        # Allow both "key": and key: syntax in JavaScript object literals
-        pattern = f'("|\')?{modality}("|\')?:\\s*\\['
-        if re.search(pattern, content):
+        if modality in prompt_keys:
             print(f"✓ Prompts found for: {modality}")
         else:
             print(f"✗ Prompts missing for: {modality}")
@@ -64,9 +84,7 @@ def test_random_prompts_exist():
 
     image_modes = ["img2img", "img2video", "controlnet"]
     for mode in image_modes:
-        # Allow both "key": and key: syntax in JavaScript object literals
-        pattern = f'("|\')?{mode}("|\')?:\\s*\\['
-        if re.search(pattern, content):
+        if mode in prompt_keys:
             print(f"✓ Prompts found for: {mode}")
         else:
             print(f"✗ Prompts missing for: {mode}")
@@ -87,8 +105,7 @@ def test_random_prompts_exist():
     print("✓ setRandomPrompt called on initialization")
 
     # Check it's called in switchMode
-    pattern = r"function switchMode.*?setRandomPrompt\(mode\)"
-    if re.search(pattern, content, re.DOTALL):
+    if SWITCH_MODE_RE.search(content):
         print("✓ setRandomPrompt called in switchMode")
     else:
         print("✗ setRandomPrompt not called in switchMode")
@@ -107,13 +124,11 @@ def test_tooltip_count():
     print("TEST: Tooltip Coverage")
     print("="*70)
 
-    server_file = Path(__file__).parent.parent / "image_gen" / "visualization_server.py"
-    content = server_file.read_text()
+    content = _read_static("index.html")
 
-    # Count tooltip instances
-    tooltip_pattern = r'<div class="tooltip">'
-    tooltips = re.findall(tooltip_pattern, content)
-    count = len(tooltips)
+    # Count tooltip instances (components carry their text in data attributes)
+    titles = [html.unescape(title) for title in TOOLTIP_TITLE_RE.findall(content)]
+    count = len(titles)
 
     print(f"Found {count} tooltip instances")
 
@@ -137,22 +152,25 @@ def test_tooltip_count():
         "Output & Completion"
     ]
 
+    # Titles may extend the component name, e.g. "Text Embedding (CLIP)"
+    component_re = re.compile("|".join(map(re.escape, expected_components)))
+    found = {match.group(0) for match in map(component_re.match, titles) if match}
+
     print(f"\nChecking for expected component tooltips:")
     for component in expected_components:
-        pattern = f'tooltip-title">{re.escape(component)}'
-        if re.search(pattern, content):
+        if component in found:
             print(f"✓ {component}")
         else:
             print(f"⚠️  {component} - not found")
 
-    # Check tooltip CSS exists
-    if ".component .tooltip {" in content:
-        print(f"\n✓ Tooltip CSS found")
+    # Check the shared tooltip element and its CSS exist
+    if 'id="pipelineTooltip"' in content and ".pipeline-tooltip {" in content:
+        print(f"\n✓ Tooltip element and CSS found")
     else:
-        print(f"\n✗ Tooltip CSS missing")
+        print(f"\n✗ Tooltip element or CSS missing")
         return False
 
-    if ".component:hover .tooltip {" in content:
+    if ".pipeline-tooltip.visible {" in content:
         print(f"✓ Tooltip hover effect found")
     else:
         print(f"✗ Tooltip hover effect missing")
@@ -171,36 +189,31 @@ def test_html_structure():
     print("TEST: HTML Structure Validation")
     print("="*70)
 
-    server_file = Path(__file__).parent.parent / "image_gen" / "visualization_server.py"
-    content = server_file.read_text()
-
-    # Extract HTML content
-    html_start = content.find('html_content = """')
-    html_end = content.find('"""', html_start + 20)
+    page = _read_static("index.html")
 
-    if html_start == -1 or html_end == -1:
+    if page is None:
         print("✗ Could not find HTML content")
         return False
 
-    html = content[html_start:html_end]
+    script = _read_static("app.js") or ""
 
-    # Check for key structural elements
+    # Check for key structural elements (markup in index.html, logic in app.js)
     checks = [
-        ("<html", "HTML tag"),
-        ("<head", "Head section"),
-        ("<body", "Body section"),
-        ("<style>", "Style section"),
-        ("<script>", "Script section"),
-        ('id="prompt"', "Prompt textarea"),
-        ('id="generateForm"', "Generate form"),
-        ("const creativePrompts", "Creative prompts JS"),
-        ("function setRandomPrompt", "setRandomPrompt function"),
-        ("function switchMode", "switchMode function"),
+        ("<html", "HTML tag", page),
+        ("<head", "Head section", page),
+        ("<body", "Body section", page),
+        ("<style>", "Style section", page),
+        ('<script src="/app.js', "Script reference", page),
+        ('id="prompt"', "Prompt textarea", page),
+        ('id="generateForm"', "Generate form", page),
+        ("const creativePrompts", "Creative prompts JS", script),
+        ("function setRandomPrompt", "setRandomPrompt function", script),
+        ("function switchMode", "switchMode function", script),
     ]
 
     all_passed = True
-    for search_str, description in checks:
-        if search_str in html:
+    for search_str, description, content in checks:
+        if search_str in content:
             print(f"✓ {description}")
         else:
             print(f"✗ {description} - NOT FOUND")